@@ -1,8 +1,14 @@
 """Apps configuration for accounts."""
 
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class AccountsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "accounts"
+
+    def ready(self):
+        from . import signals
+
+        post_migrate.connect(signals.install_search, sender=self)
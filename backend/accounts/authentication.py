@@ -0,0 +1,84 @@
+"""JWT authentication that builds the request user from token claims."""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+User = get_user_model()
+
+# Account state that can change during a token's lifetime; read through the cache.
+STATE_FIELDS = ("is_active", "is_banned", "role")
+# Profile fields copied from the claims added by CustomTokenObtainPairSerializer.
+CLAIM_FIELDS = ("email", "first_name", "last_name")
+
+
+def auth_state_key(user_id):
+    return f"accounts:auth-state:{user_id}"
+
+
+def get_auth_state(user_id):
+    """Return (is_active, is_banned, role) for a user, cached for a short TTL."""
+    key = auth_state_key(user_id)
+    state = cache.get(key)
+    if state is None:
+        state = User.objects.filter(pk=user_id).values_list(*STATE_FIELDS).first()
+        if state is None:
+            return None
+        cache.set(key, tuple(state), settings.AUTH_STATE_CACHE_TTL)
+    return state
+
+
+def invalidate_auth_state(user_id):
+    """Drop a user's cached state so the next request rereads it.
+
+    Only the process that saved the user sees this unless the default cache
+    is shared (REDIS_CACHE_URL); elsewhere a ban or deactivation takes
+    effect once AUTH_STATE_CACHE_TTL expires.
+    """
+    cache.delete(auth_state_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """Authenticate without loading the user row on every request.
+
+    The user is a ``CustomUser`` instance assembled with ``from_db`` from the
+    token's claims plus the cached account state. Every other field is
+    deferred and loads on first access. The claims may be older than the
+    row, so views that save the user must reload it first (see
+    ``get_current_user``) or pass ``update_fields``.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        state = get_auth_state(user_id)
+        if state is None:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+
+        values = dict(zip(STATE_FIELDS, state))
+        if not values["is_active"]:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        if values["is_banned"]:
+            raise AuthenticationFailed("User is banned", code="user_banned")
+
+        for field in CLAIM_FIELDS:
+            if field in validated_token:
+                values[field] = validated_token[field]
+
+        values[User._meta.pk.attname] = User._meta.pk.to_python(user_id)
+        # from_db expects values in concrete field order.
+        field_names = [
+            f.attname for f in User._meta.concrete_fields if f.attname in values
+        ]
+        return User.from_db(
+            "default", field_names, [values[name] for name in field_names]
+        )
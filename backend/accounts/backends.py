@@ -0,0 +1,25 @@
+"""Authentication backends for accounts app."""
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from .hashing import check_user_password, hash_password
+
+UserModel = get_user_model()
+
+
+class PooledModelBackend(ModelBackend):
+    """ModelBackend that checks passwords on the hashing process pool."""
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Hash once anyway to keep timing close to the existing-user path.
+            hash_password(password)
+        else:
+            if check_user_password(user, password) and self.user_can_authenticate(user):
+                return user
@@ -0,0 +1,16 @@
+"""Password hashers with per-environment cost parameters."""
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with iterations taken from PASSWORD_HASH_ITERATIONS.
+
+    Existing hashes with a different iteration count are re-hashed on the
+    next successful login, as with Django's own hasher upgrades.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASH_ITERATIONS
@@ -0,0 +1,101 @@
+"""Password hashing and checking on a bounded process pool.
+
+PBKDF2 is deliberately CPU-heavy. These helpers hand the work to a pool of
+PASSWORD_HASH_WORKERS processes, which caps the cores a burst of sign-ups
+or logins can take from the rest of the server process. Set it to 0 to
+hash inline, e.g. in tests.
+
+The bound is per server process: each worker process owns its own pool,
+so up to PASSWORD_HASH_WORKERS x server processes hashes run at once. The
+calling thread still blocks until its hash is done; the pool limits CPU
+contention, it does not free the request thread for other work.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker():
+    import django
+
+    django.setup()
+
+
+def _make(raw_password):
+    return hashers.make_password(raw_password)
+
+
+def _check(raw_password, encoded):
+    needs_update = []
+    valid = hashers.check_password(
+        raw_password, encoded, setter=lambda _: needs_update.append(True)
+    )
+    return valid, bool(needs_update)
+
+
+def get_pool():
+    """Return the shared hashing pool, or None when hashing inline."""
+    global _pool
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+def _run(func, *args):
+    pool = get_pool()
+    if pool is None:
+        return func(*args)
+    # Blocks this thread; only the CPU work moves to the pool.
+    return pool.submit(func, *args).result()
+
+
+def hash_password(raw_password):
+    """Return the encoded hash of ``raw_password``."""
+    return _run(_make, raw_password)
+
+
+def hash_passwords(raw_passwords):
+    """Return encoded hashes for ``raw_passwords``, spread across the pool."""
+    pool = get_pool()
+    if pool is None:
+        return [_make(raw) for raw in raw_passwords]
+    return list(pool.map(_make, raw_passwords))
+
+
+def check_password(raw_password, encoded):
+    """Return (is_correct, needs_rehash) for ``raw_password`` against ``encoded``."""
+    if raw_password is None or not hashers.is_password_usable(encoded):
+        return False, False
+    return _run(_check, raw_password, encoded)
+
+
+def check_user_password(user, raw_password):
+    """Pooled equivalent of ``user.check_password`` including hash upgrades."""
+    valid, needs_rehash = check_password(raw_password, user.password)
+    if valid and needs_rehash:
+        user.password = hash_password(raw_password)
+        user.save(update_fields=["password"])
+    return valid
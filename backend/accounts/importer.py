@@ -0,0 +1,164 @@
+"""Bulk member import from CSV.
+
+Rows are read as a stream and handled in chunks. For each chunk the rows are
+validated, checked against existing accounts with one query and given random
+initial passwords hashed across the hashing pool. Nothing is written until
+the whole file has been read: every chunk is then inserted with a single
+``bulk_create`` inside one transaction, so a file that fails to decode
+halfway through creates no accounts (and loses no passwords). Bad rows are
+reported and skipped; they never abort the rest of the import.
+"""
+
+import csv
+import secrets
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from . import search
+from .hashing import hash_passwords
+
+User = get_user_model()
+
+COLUMNS = ("email", "first_name", "last_name", "year_group")
+CHUNK_SIZE = 500
+
+
+def import_members(stream, chunk_size=CHUNK_SIZE):
+    """Create members from a CSV text stream with a header row.
+
+    Returns ``{"created": [...], "errors": [...]}``. Each created entry
+    carries the new user's id, email and initial password; each error
+    carries the CSV line number, the email (if any) and the reason.
+    """
+    reader = csv.DictReader(stream)
+    missing = set(COLUMNS) - set(reader.fieldnames or ())
+    if missing:
+        raise ValueError(f"CSV is missing columns: {', '.join(sorted(missing))}")
+
+    result = {"created": [], "errors": []}
+    seen = set()
+    prepared = []
+    rows = ((reader.line_num, row) for row in reader)
+    while chunk := list(islice(rows, chunk_size)):
+        new = _check_chunk(chunk, seen, result["errors"])
+        if new:
+            prepared.append(_prepare_chunk(new))
+
+    created = []
+    with transaction.atomic():
+        for new, users, passwords in prepared:
+            created.extend(_insert_chunk(new, users, passwords, result["errors"]))
+
+    # bulk_create skips the post_save hook that maintains the search index.
+    search.index_users([user for user, _ in created])
+    result["created"] = [
+        {"id": user.pk, "email": user.email, "password": password}
+        for user, password in created
+    ]
+    result["errors"].sort(key=lambda error: error["line"])
+    return result
+
+
+def _clean_row(row):
+    email = User.objects.normalize_email((row.get("email") or "").strip())
+    first_name = (row.get("first_name") or "").strip()
+    last_name = (row.get("last_name") or "").strip()
+    year_group = (row.get("year_group") or "").strip().upper()
+
+    validate_email(email)
+    if not first_name or not last_name:
+        raise ValidationError("first_name and last_name are required")
+    if year_group not in User.YearGroup.values:
+        raise ValidationError(f"Unknown year_group {year_group!r}")
+    return {
+        "email": email,
+        "first_name": first_name,
+        "last_name": last_name,
+        "year_group": year_group,
+    }
+
+
+def _check_chunk(chunk, seen, errors):
+    """Return the chunk's new, valid rows as (line, fields); report the rest."""
+    valid = []
+    for line, row in chunk:
+        try:
+            fields = _clean_row(row)
+        except ValidationError as exc:
+            errors.append(
+                {"line": line, "email": row.get("email"), "error": exc.messages[0]}
+            )
+            continue
+        key = fields["email"].lower()
+        if key in seen:
+            errors.append(
+                {"line": line, "email": fields["email"], "error": "Duplicate in file"}
+            )
+            continue
+        seen.add(key)
+        valid.append((line, fields))
+
+    if not valid:
+        return []
+
+    # Existing accounts may differ only in case (older rows were not
+    # lowercased), so compare lowercased columns against lowercased emails.
+    lowered = [fields["email"].lower() for _, fields in valid]
+    taken = {
+        value
+        for pair in User.objects.annotate(e=Lower("email"), u=Lower("username"))
+        .filter(Q(e__in=lowered) | Q(u__in=lowered))
+        .values_list("e", "u")
+        for value in pair
+    }
+    new = []
+    for line, fields in valid:
+        if fields["email"].lower() in taken:
+            errors.append(
+                {"line": line, "email": fields["email"], "error": "Already a member"}
+            )
+        else:
+            new.append((line, fields))
+
+    return new
+
+
+def _prepare_chunk(new):
+    passwords = [secrets.token_urlsafe(12) for _ in new]
+    users = [
+        User(username=fields["email"], password=encoded, **fields)
+        for (_, fields), encoded in zip(new, hash_passwords(passwords))
+    ]
+    return new, users, passwords
+
+
+def _insert_chunk(new, users, passwords, errors):
+    """Insert one chunk; return (user, password) for each row created."""
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            created = list(zip(users, passwords))
+    except IntegrityError:
+        # Someone registered one of these emails since the check above; fall
+        # back to row-by-row inserts so only the conflicting rows fail.
+        created = []
+        for (line, fields), user, password in zip(new, users, passwords):
+            try:
+                with transaction.atomic():
+                    user.save(force_insert=True)
+                created.append((user, password))
+            except IntegrityError:
+                errors.append(
+                    {
+                        "line": line,
+                        "email": fields["email"],
+                        "error": "Already a member",
+                    }
+                )
+    return created
@@ -0,0 +1,101 @@
+"""Benchmark password hashing under a concurrent registration burst.
+
+Each simulated request thread hashes one password, as registration does.
+The burst is run inline and on the hashing pool at each requested size,
+while a probe thread in the same process times a short pure-Python loop.
+The probe shows CPU and GIL contention inside one process; it does not
+model how a server schedules requests, and each burst thread still waits
+for its own hash:
+
+    python manage.py benchmark_hashing --registrations 200 --concurrency 16
+    python manage.py benchmark_hashing --pool-sizes 1,2,4
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from accounts import hashing
+from core.management.commands.benchmark_api import percentile
+
+
+class Command(BaseCommand):
+    help = "Benchmark password hashing throughput inline and on the process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--registrations", type=int, default=100)
+        parser.add_argument(
+            "--concurrency", type=int, default=8, help="Simulated request threads."
+        )
+        parser.add_argument(
+            "--pool-sizes",
+            default=str(settings.PASSWORD_HASH_WORKERS or 2),
+            help="Comma-separated hashing pool sizes to compare against inline.",
+        )
+
+    def handle(self, *args, **options):
+        sizes = [0] + [int(size) for size in options["pool_sizes"].split(",")]
+        self.stdout.write(
+            f"{options['registrations']} registrations, "
+            f"{options['concurrency']} threads, "
+            f"{settings.PASSWORD_HASH_ITERATIONS} PBKDF2 iterations"
+        )
+        self.stdout.write(
+            f"{'mode':<10}{'hashes/s':>10}{'p50':>10}{'p95':>10}"
+            f"{'probe p50':>11}{'probe p95':>11}"
+        )
+        for size in sizes:
+            with override_settings(PASSWORD_HASH_WORKERS=size):
+                hashing.shutdown_pool()
+                if size:
+                    # Start the workers outside the timed burst.
+                    hashing.hash_password("warm-up")
+                row = self.burst(options["registrations"], options["concurrency"])
+                hashing.shutdown_pool()
+
+            mode = f"pool={size}" if size else "inline"
+            self.stdout.write(
+                f"{mode:<10}{row['throughput']:>10.1f}{row['p50_ms']:>10.1f}"
+                f"{row['p95_ms']:>10.1f}{row['probe_p50_ms']:>11.2f}"
+                f"{row['probe_p95_ms']:>11.2f}"
+            )
+
+    def burst(self, registrations, concurrency):
+        latencies, probes = [], []
+        done = threading.Event()
+
+        def register(n):
+            started = time.perf_counter()
+            hashing.hash_password(f"benchmark-pass-{n}")
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        def probe():
+            # CPU-bound work sharing this process with the burst.
+            while not done.is_set():
+                started = time.perf_counter()
+                sum(i * i for i in range(2000))
+                probes.append((time.perf_counter() - started) * 1000)
+                time.sleep(0.005)
+
+        prober = threading.Thread(target=probe, daemon=True)
+        prober.start()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(register, range(registrations)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        prober.join()
+
+        latencies.sort()
+        probes.sort()
+        return {
+            "throughput": registrations / elapsed,
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "probe_p50_ms": percentile(probes, 50),
+            "probe_p95_ms": percentile(probes, 95),
+        }
@@ -0,0 +1,13 @@
+"""Create and repopulate the member search index."""
+
+from django.core.management.base import BaseCommand
+from accounts import search
+
+
+class Command(BaseCommand):
+    help = "Create the member search index and rebuild it from the user table."
+
+    def handle(self, *args, **options):
+        search.install()
+        search.rebuild()
+        self.stdout.write(self.style.SUCCESS("Member search index rebuilt."))
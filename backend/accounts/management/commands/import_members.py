@@ -0,0 +1,45 @@
+"""Import members from a CSV of email,first_name,last_name,year_group."""
+
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+from accounts.importer import CHUNK_SIZE, import_members
+
+
+class Command(BaseCommand):
+    help = "Create member accounts from a CSV file, reporting bad rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV with a header row.")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+        parser.add_argument(
+            "--credentials",
+            help="Write email,password for each new member to this CSV.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"], newline="", encoding="utf-8-sig") as fh:
+                result = import_members(fh, chunk_size=options["chunk_size"])
+        except (OSError, ValueError) as exc:
+            raise CommandError(exc)
+
+        for error in result["errors"]:
+            self.stderr.write(
+                f"line {error['line']}: {error['email'] or '-'}: {error['error']}"
+            )
+
+        if options["credentials"]:
+            with open(options["credentials"], "w", newline="") as fh:
+                writer = csv.writer(fh)
+                writer.writerow(["email", "password"])
+                writer.writerows(
+                    (row["email"], row["password"]) for row in result["created"]
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {len(result['created'])} members, "
+                f"{len(result['errors'])} rows rejected."
+            )
+        )
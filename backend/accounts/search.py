@@ -0,0 +1,182 @@
+"""Indexed member search.
+
+PostgreSQL: a pg_trgm GIN index over the lower-cased name and email answers
+substring matches, and results are ranked by trigram similarity.
+
+SQLite (development): an FTS5 table using the trigram tokenizer holds one row
+per searchable member. ``accounts.signals`` keeps it in step with user saves
+and deletes; ``manage.py build_member_search`` rebuilds it after bulk loads.
+
+Both structures are created after ``migrate`` via a post_migrate hook.
+"""
+
+import logging
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Q
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "accounts_member_search"
+TRGM_INDEX = "accounts_member_search_trgm"
+PG_DOCUMENT = "lower(first_name || ' ' || last_name || ' ' || email)"
+
+_pg_trgm_available = None
+
+
+def _user_table():
+    return get_user_model()._meta.db_table
+
+
+def install():
+    """Create the search structures for the current database if missing."""
+    if connection.vendor == "postgresql":
+        global _pg_trgm_available
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {TRGM_INDEX} ON {_user_table()} "
+                    f"USING gin (({PG_DOCUMENT}) gin_trgm_ops)"
+                )
+            _pg_trgm_available = True
+        except Exception:
+            _pg_trgm_available = False
+            logger.warning("pg_trgm unavailable; member search will scan the table")
+    elif connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+                f"USING fts5(name, email, tokenize='trigram')"
+            )
+        rebuild()
+
+
+def rebuild():
+    """Repopulate the SQLite search table from the user table."""
+    if connection.vendor != "sqlite":
+        return
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, name, email) "
+            f"SELECT id, first_name || ' ' || last_name, email FROM {_user_table()} "
+            f"WHERE is_active AND NOT is_banned"
+        )
+
+
+def index_user(user):
+    """Add, refresh or drop one user's search row (SQLite only)."""
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [user.pk])
+        if user.is_active and not user.is_banned:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, name, email) VALUES (%s, %s, %s)",
+                [user.pk, f"{user.first_name} {user.last_name}", user.email],
+            )
+
+
+def index_users(users):
+    """Add search rows for freshly bulk-created users (SQLite only)."""
+    if connection.vendor != "sqlite":
+        return
+    rows = [
+        (user.pk, f"{user.first_name} {user.last_name}", user.email)
+        for user in users
+        if user.is_active and not user.is_banned
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {FTS_TABLE} (rowid, name, email) "
+            f"VALUES (%s, %s, %s)",
+            rows,
+        )
+
+
+def remove_user(user_id):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [user_id])
+
+
+def _like_escape(query):
+    return query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_user_ids(query, limit=20):
+    """Return ids of active, unbanned members matching ``query``, best first.
+
+    Matches on a prefix of any name part or the email rank above plain
+    substring matches.
+    """
+    query = query.strip().lower()
+    if connection.vendor == "postgresql" and _trgm_ready():
+        return _search_postgresql(query, limit)
+    if connection.vendor == "sqlite":
+        return _search_sqlite(query, limit)
+    return list(
+        get_user_model()
+        .objects.filter(
+            Q(first_name__icontains=query)
+            | Q(last_name__icontains=query)
+            | Q(email__icontains=query),
+            is_active=True,
+            is_banned=False,
+        )
+        .values_list("id", flat=True)[:limit]
+    )
+
+
+def _trgm_ready():
+    global _pg_trgm_available
+    if _pg_trgm_available is None:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _pg_trgm_available = cursor.fetchone() is not None
+    return _pg_trgm_available
+
+
+def _search_postgresql(query, limit):
+    escaped = _like_escape(query)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT id FROM {_user_table()} "
+            f"WHERE is_active AND NOT is_banned AND {PG_DOCUMENT} LIKE %s "
+            f"ORDER BY ({PG_DOCUMENT} LIKE %s OR {PG_DOCUMENT} LIKE %s) DESC, "
+            f"similarity({PG_DOCUMENT}, %s) DESC, id "
+            f"LIMIT %s",
+            [f"%{escaped}%", f"{escaped}%", f"% {escaped}%", query, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _search_sqlite(query, limit):
+    escaped = _like_escape(query)
+    prefix_rank = (
+        "CASE WHEN name LIKE %s ESCAPE '\\' OR name LIKE %s ESCAPE '\\' "
+        "OR email LIKE %s ESCAPE '\\' THEN 0 ELSE 1 END"
+    )
+    prefix_params = [f"{escaped}%", f"% {escaped}%", f"{escaped}%"]
+    with connection.cursor() as cursor:
+        if len(query) >= 3:
+            # Trigram MATCH is index-backed; the phrase is quoted for FTS5.
+            phrase = '"' + query.replace('"', '""') + '"'
+            cursor.execute(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+                f"ORDER BY {prefix_rank}, bm25({FTS_TABLE}), rowid LIMIT %s",
+                [phrase, *prefix_params, limit],
+            )
+        else:
+            # Trigrams need three characters; two-character queries fall back
+            # to prefix matching over the (small) search table.
+            cursor.execute(
+                f"SELECT rowid FROM {FTS_TABLE} "
+                f"WHERE name LIKE %s ESCAPE '\\' OR name LIKE %s ESCAPE '\\' "
+                f"OR email LIKE %s ESCAPE '\\' ORDER BY rowid LIMIT %s",
+                [*prefix_params, limit],
+            )
+        return [row[0] for row in cursor.fetchall()]
@@ -4,7 +4,8 @@ from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
-from django.db.models import Sum
+from shop.models import PointBalance
+from .hashing import hash_password
 from .models import ExecApplication
 
 User = get_user_model()
@@ -19,6 +20,8 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         token["email"] = user.email
         token["role"] = user.role
         token["name"] = f"{user.first_name} {user.last_name}"
+        token["first_name"] = user.first_name
+        token["last_name"] = user.last_name
         return token
 
     def validate(self, attrs):
@@ -54,13 +57,13 @@ class UserRegisterSerializer(serializers.ModelSerializer):
         return attrs
 
     def create(self, validated_data):
-        user = User.objects.create_user(
+        user = User.objects.create(
             username=validated_data["email"],
-            email=validated_data["email"],
+            email=User.objects.normalize_email(validated_data["email"]),
             first_name=validated_data["first_name"],
             last_name=validated_data["last_name"],
             year_group=validated_data["year_group"],
-            password=validated_data["password"],
+            password=hash_password(validated_data["password"]),
         )
         return user
 
@@ -107,9 +110,8 @@ class UserProfileSerializer(serializers.ModelSerializer):
         return f"{obj.first_name} {obj.last_name}".strip()
 
     def get_points(self, obj):
-        """Calculate total points from transactions."""
-        total = obj.point_transactions.aggregate(total=Sum("amount"))["total"] or 0
-        return total
+        """Read the materialized points balance."""
+        return PointBalance.for_user(obj)
 
 
 class ExecApplicationSerializer(serializers.ModelSerializer):
@@ -0,0 +1,25 @@
+"""Signal handlers keeping the member search index in step with users."""
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from . import search
+from .authentication import invalidate_auth_state
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, **kwargs):
+    invalidate_auth_state(instance.pk)
+    search.index_user(instance)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    invalidate_auth_state(instance.pk)
+    search.remove_user(instance.pk)
+
+
+def install_search(sender, **kwargs):
+    search.install()
@@ -1,5 +1,7 @@
 """Views for accounts app - user auth and profile management."""
 
+import io
+
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -7,8 +9,10 @@ from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from django.db.models import Q
+from .hashing import check_user_password, hash_password
+from . import importer
 from .models import ExecApplication
+from .search import search_user_ids
 from .serializers_new import (
     CustomTokenObtainPairSerializer,
     UserRegisterSerializer,
@@ -41,6 +45,17 @@ class UserViewSet(viewsets.ModelViewSet):
             return UserListSerializer
         return UserProfileSerializer
 
+    def get_current_user(self):
+        """Return the requesting user with every field loaded.
+
+        Token-authenticated users only carry their claims and account state;
+        reload the full row once instead of lazily loading field by field.
+        """
+        user = self.request.user
+        if user.get_deferred_fields():
+            user = User.objects.get(pk=user.pk)
+        return user
+
     @action(detail=False, methods=["post"], permission_classes=[permissions.AllowAny])
     def register(self, request):
         """Register a new user."""
@@ -63,7 +78,7 @@ class UserViewSet(viewsets.ModelViewSet):
     )
     def me(self, request):
         """Get current user profile."""
-        serializer = self.get_serializer(request.user)
+        serializer = self.get_serializer(self.get_current_user())
         return Response(serializer.data)
 
     @action(
@@ -71,7 +86,9 @@ class UserViewSet(viewsets.ModelViewSet):
     )
     def me_update(self, request):
         """Update current user profile."""
-        serializer = self.get_serializer(request.user, data=request.data, partial=True)
+        serializer = self.get_serializer(
+            self.get_current_user(), data=request.data, partial=True
+        )
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
@@ -95,9 +112,9 @@ class UserViewSet(viewsets.ModelViewSet):
     )
     def delete_account(self, request):
         """Delete current user account (leave club)."""
-        user = request.user
+        user = self.get_current_user()
         user.is_active = False
-        user.save()
+        user.save(update_fields=["is_active"])
         return Response(
             {"message": "Account deactivated"}, status=status.HTTP_204_NO_CONTENT
         )
@@ -107,7 +124,7 @@ class UserViewSet(viewsets.ModelViewSet):
     )
     def change_password(self, request):
         """Change password."""
-        user = request.user
+        user = self.get_current_user()
         old_password = request.data.get("old_password")
         new_password = request.data.get("new_password")
 
@@ -117,33 +134,62 @@ class UserViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        if not user.check_password(old_password):
+        if not check_user_password(user, old_password):
             return Response(
                 {"error": "Old password is incorrect"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        user.set_password(new_password)
-        user.save()
+        user.password = hash_password(new_password)
+        user.save(update_fields=["password"])
         return Response({"message": "Password updated"})
 
+    @action(
+        detail=False, methods=["post"], permission_classes=[permissions.IsAuthenticated]
+    )
+    def import_members(self, request):
+        """Create members from an uploaded CSV (admin only)."""
+        if request.user.role != "admin":
+            return Response(
+                {"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN
+            )
+
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response(
+                {"error": "CSV file required"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            result = importer.import_members(
+                io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+            )
+        except (UnicodeDecodeError, ValueError) as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            {
+                "created": len(result["created"]),
+                "members": result["created"],
+                "errors": result["errors"],
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
     @action(detail=False, methods=["get"])
     def search(self, request):
-        """Search for users by name or email."""
+        """Search for users by name or email, best matches first."""
         query = request.query_params.get("q", "")
         if len(query) < 2:
             return Response(
                 {"error": "Query too short"}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        users = User.objects.filter(
-            Q(first_name__icontains=query)
-            | Q(last_name__icontains=query)
-            | Q(email__icontains=query),
-            is_active=True,
-            is_banned=False,
-        )[:20]
-        serializer = UserListSerializer(users, many=True)
+        user_ids = search_user_ids(query, limit=20)
+        users = User.objects.in_bulk(user_ids)
+        serializer = UserListSerializer(
+            [users[user_id] for user_id in user_ids if user_id in users], many=True
+        )
         return Response(serializer.data)
 
 
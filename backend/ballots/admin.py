@@ -14,6 +14,7 @@ class BallotAdmin(admin.ModelAdmin):
 @admin.register(BallotOption)
 class BallotOptionAdmin(admin.ModelAdmin):
     list_display = ("text", "ballot", "vote_count")
+    readonly_fields = ("vote_count",)
     search_fields = ("text", "ballot__title")
 
 
@@ -1,6 +1,7 @@
 """Models for ballots app - voting system."""
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -19,6 +20,27 @@ class Ballot(models.Model):
     def __str__(self):
         return self.title
 
+    def tally(self):
+        """Return options annotated with live vote counts in one grouped query."""
+        return self.options.annotate(votes=Count("vote")).order_by("id")
+
+    def close_ballot(self):
+        """Close the ballot and freeze its tallies into BallotOption.vote_count.
+
+        The snapshot is written once; closing an already closed ballot leaves
+        the stored counts untouched.
+        """
+        with transaction.atomic():
+            ballot = Ballot.objects.select_for_update().get(pk=self.pk)
+            if not ballot.closed:
+                options = list(ballot.tally())
+                for option in options:
+                    option.vote_count = option.votes
+                BallotOption.objects.bulk_update(options, ["vote_count"])
+                ballot.closed = True
+                ballot.save(update_fields=["closed"])
+        self.closed = True
+
 
 class BallotOption(models.Model):
     """Option in a ballot."""
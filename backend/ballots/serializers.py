@@ -11,11 +11,16 @@ class BallotOptionSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = BallotOption
-        fields = ("id", "ballot", "text", "vote_count", "created_at")
-        read_only_fields = ("id", "ballot", "created_at", "vote_count")
+        fields = ("id", "ballot", "text", "vote_count")
+        read_only_fields = ("id", "ballot", "vote_count")
 
     def get_vote_count(self, obj):
-        return obj.votes.count()
+        """Frozen snapshot when closed, else the annotated or counted total."""
+        if obj.ballot.closed:
+            return obj.vote_count
+        if hasattr(obj, "votes"):
+            return obj.votes
+        return obj.vote_set.count()
 
 
 class BallotSerializer(serializers.ModelSerializer):
@@ -46,14 +51,20 @@ class BallotSerializer(serializers.ModelSerializer):
         read_only_fields = ("id", "created_by", "created_at", "closed", "options")
 
     def get_user_vote(self, obj):
-        """Get current user's vote on this ballot."""
+        """Get current user's vote on this ballot.
+
+        List views pass ``user_votes`` (ballot id -> option id) in the
+        context so the whole page is resolved with one query.
+        """
+        if "user_votes" in self.context:
+            return self.context["user_votes"].get(obj.id)
         request = self.context.get("request")
         if request and request.user and request.user.is_authenticated:
-            try:
-                vote = Vote.objects.get(ballot=obj, user=request.user)
-                return vote.option.id
-            except Vote.DoesNotExist:
-                return None
+            return (
+                Vote.objects.filter(ballot=obj, user=request.user)
+                .values_list("option_id", flat=True)
+                .first()
+            )
         return None
 
     def get_is_open(self, obj):
@@ -64,6 +75,8 @@ class BallotSerializer(serializers.ModelSerializer):
 
     def get_vote_count(self, obj):
         """Total number of votes cast."""
+        if hasattr(obj, "total_votes"):
+            return obj.total_votes
         return obj.votes.count()
 
 
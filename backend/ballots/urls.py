@@ -2,5 +2,12 @@
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import views
 
-urlpatterns = []
+router = DefaultRouter()
+router.register(r"ballots", views.BallotViewSet, basename="ballot")
+router.register(r"votes", views.VoteViewSet, basename="vote")
+
+urlpatterns = [
+    path("", include(router.urls)),
+]
@@ -4,7 +4,7 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.utils import timezone
-from django.db.models import Count
+from django.db.models import Count, Prefetch
 from .models import Ballot, BallotOption, Vote
 from .serializers import BallotSerializer, BallotOptionSerializer, VoteSerializer
 
@@ -33,6 +33,38 @@ class BallotViewSet(viewsets.ModelViewSet):
     ordering_fields = ["created_at", "closing_date"]
     ordering = ["-created_at"]
 
+    def get_queryset(self):
+        """Annotate vote totals and prefetch options with their counts."""
+        return (
+            Ballot.objects.select_related("created_by")
+            .annotate(total_votes=Count("votes"))
+            .prefetch_related(
+                Prefetch(
+                    "options",
+                    queryset=BallotOption.objects.annotate(
+                        votes=Count("vote")
+                    ).order_by("id"),
+                )
+            )
+            .order_by("-created_at")
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        """Resolve the requesting user's votes for a whole page in one query."""
+        if kwargs.get("many") and args and self.request.user.is_authenticated:
+            ballots = list(args[0])
+            user_votes = dict(
+                Vote.objects.filter(
+                    user=self.request.user, ballot__in=ballots
+                ).values_list("ballot_id", "option_id")
+            )
+            kwargs["context"] = {
+                **self.get_serializer_context(),
+                "user_votes": user_votes,
+            }
+            args = (ballots, *args[1:])
+        return super().get_serializer(*args, **kwargs)
+
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
@@ -67,28 +99,38 @@ class BallotViewSet(viewsets.ModelViewSet):
     def results(self, request, pk=None):
         """Get detailed results of a ballot."""
         ballot = self.get_object()
-        results = []
-
-        for option in ballot.options.all():
-            vote_count = option.votes.count()
-            results.append(
-                {
-                    "id": option.id,
-                    "text": option.text,
-                    "votes": vote_count,
-                    "percentage": (
-                        round((vote_count / ballot.votes.count() * 100), 2)
-                        if ballot.votes.count() > 0
-                        else 0
-                    ),
-                }
-            )
+
+        if not ballot.closed and timezone.now() >= ballot.closing_date:
+            ballot.close_ballot()
+            # Reload so the prefetched options carry the frozen counts.
+            ballot = self.get_object()
+
+        # Closed ballots are served from the frozen snapshot, open ones from
+        # the counts get_queryset already annotated.
+        counts = [
+            (option, option.vote_count if ballot.closed else option.votes)
+            for option in ballot.options.all()
+        ]
+
+        total_votes = sum(votes for _, votes in counts)
+        results = [
+            {
+                "id": option.id,
+                "text": option.text,
+                "votes": votes,
+                "percentage": (
+                    round((votes / total_votes * 100), 2) if total_votes > 0 else 0
+                ),
+            }
+            for option, votes in counts
+        ]
 
         return Response(
             {
                 "ballot_id": ballot.id,
                 "title": ballot.title,
-                "total_votes": ballot.votes.count(),
+                "closed": ballot.closed,
+                "total_votes": total_votes,
                 "options": sorted(results, key=lambda x: x["votes"], reverse=True),
             }
         )
@@ -103,9 +145,9 @@ class BallotViewSet(viewsets.ModelViewSet):
                 {"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN
             )
 
-        ballot = self.get_object()
-        ballot.close_ballot()
-        serializer = self.get_serializer(ballot)
+        self.get_object().close_ballot()
+        # Reload so the prefetched options carry the frozen counts.
+        serializer = self.get_serializer(self.get_object())
         return Response(serializer.data)
 
 
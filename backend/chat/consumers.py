@@ -1,7 +1,59 @@
 """Consumers for WebSocket chat."""
 
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
+from django.db.models import Q
 import json
+import re
+
+from notifications.models import UnreadCount
+from .models import ChatRoom
+from .writer import writer
+
+# Room names become channel-layer group names, which are ASCII and short.
+ROOM_NAME_RE = re.compile(r"\w{1,80}", re.ASCII)
+# Subscriptions one multiplexed socket may hold; each costs a group_add.
+MAX_STREAMS = 50
+
+
+def resolve_room_id(room_name):
+    """Resolve a room name (a ChatRoom id or name) to a room id, or None."""
+    if room_name.isdigit():
+        rooms = ChatRoom.objects.filter(pk=room_name)
+    else:
+        rooms = ChatRoom.objects.filter(name=room_name)
+    return rooms.values_list("id", flat=True).first()
+
+
+def room_access(room_name, user):
+    """Return (room id or None, whether ``user`` may join ``room_name``).
+
+    Rooms that don't exist yet are open broadcast channels; private rooms
+    admit members only.
+    """
+    room_id = resolve_room_id(room_name)
+    if room_id is None:
+        return None, True
+    visible = Q(is_private=False)
+    if user.is_authenticated:
+        visible |= Q(members=user)
+    return room_id, ChatRoom.objects.filter(visible, pk=room_id).exists()
+
+
+async def broadcast_chat_message(channel_layer, room_name, room_id, user, message):
+    """Queue a message for persistence and send it to the room's group."""
+    if room_id and user.is_authenticated and message:
+        writer.enqueue(room_id, user.id, message)
+
+    await channel_layer.group_send(
+        f"chat_{room_name}",
+        {
+            "type": "chat.message",
+            "room": room_name,
+            "message": message,
+            "user": user.email,
+        },
+    )
 
 
 class ChatConsumer(AsyncWebsocketConsumer):
@@ -10,6 +62,12 @@ class ChatConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.room_name = self.scope["url_route"]["kwargs"]["room_name"]
         self.room_group_name = f"chat_{self.room_name}"
+        self.room_id, allowed = await database_sync_to_async(room_access)(
+            self.room_name, self.scope["user"]
+        )
+        if not allowed:
+            await self.close()
+            return
 
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
         await self.accept()
@@ -19,15 +77,12 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
     async def receive(self, text_data):
         data = json.loads(text_data)
-        message = data.get("message")
-
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                "type": "chat.message",
-                "message": message,
-                "user": self.scope["user"].email,
-            },
+        await broadcast_chat_message(
+            self.channel_layer,
+            self.room_name,
+            self.room_id,
+            self.scope["user"],
+            data.get("message"),
         )
 
     async def chat_message(self, event):
@@ -50,4 +105,144 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         await self.channel_layer.group_discard(self.user_group_name, self.channel_name)
 
     async def notification(self, event):
-        await self.send(text_data=json.dumps({"notification": event["notification"]}))
+        message = {"notification": event["notification"]}
+        if "unread_count" in event:
+            message["unread_count"] = event["unread_count"]
+        await self.send(text_data=json.dumps(message))
+
+    async def unread_count(self, event):
+        await self.send(text_data=json.dumps({"unread_count": event["unread_count"]}))
+
+
+class StreamConsumer(AsyncWebsocketConsumer):
+    """One socket per client, multiplexing chat rooms and the notification feed.
+
+    Streams are ``chat.<room>`` (a ChatRoom id or name, as in ``ws/chat/``)
+    and ``notifications`` (the signed-in user's own feed). Clients send
+    JSON frames::
+
+        {"action": "subscribe", "stream": "chat.general"}
+        {"action": "unsubscribe", "stream": "chat.general"}
+        {"stream": "chat.general", "message": "hello"}
+
+    and receive ``{"stream": ..., "payload": {...}}`` for stream traffic,
+    ``{"stream": ..., "event": "subscribed" | "unsubscribed"}`` acks and
+    ``{"stream": ..., "error": ...}`` on refusal, including any subscribe
+    past MAX_STREAMS. Subscribing joins the same channel-layer groups as the
+    single-stream consumers, so both kinds of socket see each other's
+    messages.
+    """
+
+    async def connect(self):
+        # stream -> (group name, room id or None)
+        self.streams = {}
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        for group, _ in self.streams.values():
+            await self.channel_layer.group_discard(group, self.channel_name)
+        self.streams = {}
+
+    async def receive(self, text_data):
+        try:
+            data = json.loads(text_data)
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            await self.send_frame(None, error="Frames must be JSON objects.")
+            return
+
+        stream = data.get("stream")
+        if stream is not None and not isinstance(stream, str):
+            await self.send_frame(None, error="stream must be a string.")
+            return
+        action = data.get("action")
+        if action == "subscribe":
+            await self.subscribe(stream)
+        elif action == "unsubscribe":
+            await self.unsubscribe(stream)
+        elif action is not None:
+            await self.send_frame(stream, error=f"Unknown action {action!r}.")
+        elif stream in self.streams and stream.startswith("chat."):
+            await self.send_chat_message(stream, data.get("message"))
+        else:
+            await self.send_frame(stream, error="Not subscribed to this stream.")
+
+    async def subscribe(self, stream):
+        if stream in self.streams:
+            await self.send_frame(stream, event="subscribed")
+            return
+        if len(self.streams) >= MAX_STREAMS:
+            await self.send_frame(
+                stream, error=f"At most {MAX_STREAMS} streams per socket."
+            )
+            return
+
+        user = self.scope["user"]
+        room_id = None
+        unread = None
+        if stream == "notifications":
+            if not user.is_authenticated:
+                await self.send_frame(stream, error="Sign in to receive notifications.")
+                return
+            group = f"notifications_{user.id}"
+            unread = await database_sync_to_async(UnreadCount.for_user)(user)
+        elif isinstance(stream, str) and stream.startswith("chat."):
+            room_name = stream[len("chat.") :]
+            if not ROOM_NAME_RE.fullmatch(room_name):
+                await self.send_frame(stream, error="Unknown stream.")
+                return
+            room_id, allowed = await database_sync_to_async(room_access)(
+                room_name, user
+            )
+            if not allowed:
+                await self.send_frame(stream, error="This room is private.")
+                return
+            group = f"chat_{room_name}"
+        else:
+            await self.send_frame(stream, error="Unknown stream.")
+            return
+
+        await self.channel_layer.group_add(group, self.channel_name)
+        self.streams[stream] = (group, room_id)
+        await self.send_frame(stream, event="subscribed")
+        if unread is not None:
+            await self.send_frame(stream, payload={"unread_count": unread})
+
+    async def unsubscribe(self, stream):
+        if stream in self.streams:
+            group, _ = self.streams.pop(stream)
+            await self.channel_layer.group_discard(group, self.channel_name)
+        await self.send_frame(stream, event="unsubscribed")
+
+    async def send_chat_message(self, stream, message):
+        user = self.scope["user"]
+        if not user.is_authenticated:
+            await self.send_frame(stream, error="Sign in to send messages.")
+            return
+        if not isinstance(message, str) or not message:
+            return
+        _, room_id = self.streams[stream]
+        await broadcast_chat_message(
+            self.channel_layer, stream[len("chat.") :], room_id, user, message
+        )
+
+    async def send_frame(self, stream, **frame):
+        await self.send(text_data=json.dumps({"stream": stream, **frame}))
+
+    async def chat_message(self, event):
+        await self.send_frame(
+            f"chat.{event['room']}",
+            payload={"message": event["message"], "user": event["user"]},
+        )
+
+    async def notification(self, event):
+        payload = {"notification": event["notification"]}
+        if "unread_count" in event:
+            payload["unread_count"] = event["unread_count"]
+        await self.send_frame("notifications", payload=payload)
+
+    async def unread_count(self, event):
+        await self.send_frame(
+            "notifications", payload={"unread_count": event["unread_count"]}
+        )
@@ -0,0 +1,169 @@
+"""Compare per-stream sockets with one multiplexed socket per client.
+
+Each simulated client follows ``--rooms`` chat rooms plus its notification
+feed, once over ``ws/chat/`` + ``ws/notifications/`` sockets and once over
+a single ``ws/stream/`` socket. Runs against a throwaway test database and
+an in-memory channel layer that counts operations:
+
+    python manage.py benchmark_websockets --clients 50 --rooms 3
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from collections import Counter
+
+from channels.layers import InMemoryChannelLayer
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import (
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from chat.models import ChatRoom
+
+User = get_user_model()
+
+
+class CountingChannelLayer(InMemoryChannelLayer):
+    """In-memory layer that counts the operations each socket design costs."""
+
+    counts = Counter()
+
+    async def new_channel(self, *args, **kwargs):
+        self.counts["new_channel"] += 1
+        return await super().new_channel(*args, **kwargs)
+
+    async def group_add(self, group, channel):
+        self.counts["group_add"] += 1
+        return await super().group_add(group, channel)
+
+    async def group_discard(self, group, channel):
+        self.counts["group_discard"] += 1
+        return await super().group_discard(group, channel)
+
+    async def group_send(self, group, message):
+        self.counts["group_send"] += 1
+        return await super().group_send(group, message)
+
+
+COUNTING_LAYER = {
+    "default": {
+        "BACKEND": "chat.management.commands.benchmark_websockets."
+        "CountingChannelLayer"
+    }
+}
+
+
+class Command(BaseCommand):
+    help = "Benchmark connections and channel-layer operations per socket design."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=50)
+        parser.add_argument(
+            "--rooms", type=int, default=3, help="Chat rooms each client follows."
+        )
+
+    def handle(self, *args, **options):
+        test_settings = connection.settings_dict.setdefault("TEST", {})
+        tmpdir = None
+        if connection.vendor == "sqlite" and not test_settings.get("NAME"):
+            # Consumers query from worker threads; share an on-disk database.
+            tmpdir = tempfile.mkdtemp()
+            test_settings["NAME"] = os.path.join(tmpdir, "websockets.sqlite3")
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with override_settings(CHANNEL_LAYERS=COUNTING_LAYER):
+                self.run(options["clients"], options["rooms"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+            if tmpdir:
+                test_settings.pop("NAME")
+                os.rmdir(tmpdir)
+
+    def run(self, clients, rooms):
+        from config.asgi import websocket_urlpatterns
+
+        application = URLRouter(websocket_urlpatterns)
+        creator = User.objects.create(
+            username="rooms@example.com", email="rooms@example.com", year_group="Y13"
+        )
+        room_ids = [
+            ChatRoom.objects.create(name=f"room{i}", created_by=creator).id
+            for i in range(rooms)
+        ]
+        users = [
+            User.objects.create(
+                username=f"ws{i}@example.com",
+                email=f"ws{i}@example.com",
+                year_group="Y10",
+            )
+            for i in range(clients)
+        ]
+
+        self.stdout.write(
+            f"{clients} clients x ({rooms} rooms + notifications)\n"
+            f"{'design':<12}{'sockets':>9}{'channels':>10}{'group_add':>11}"
+            f"{'discard':>9}{'layer ops':>11}{'seconds':>9}"
+        )
+        for design, session in (
+            ("per-stream", self.per_stream),
+            ("multiplexed", self.multiplexed),
+        ):
+            CountingChannelLayer.counts.clear()
+            sockets = Counter()
+            started = time.perf_counter()
+            asyncio.run(
+                self.run_clients(application, session, users, room_ids, sockets)
+            )
+            elapsed = time.perf_counter() - started
+            counts = CountingChannelLayer.counts
+            self.stdout.write(
+                f"{design:<12}{sockets['opened']:>9}{counts['new_channel']:>10}"
+                f"{counts['group_add']:>11}{counts['group_discard']:>9}"
+                f"{sum(counts.values()):>11}{elapsed:>9.2f}"
+            )
+
+    async def run_clients(self, application, session, users, room_ids, sockets):
+        await asyncio.gather(
+            *[session(application, user, room_ids, sockets) for user in users]
+        )
+
+    def open(self, application, path, user, sockets):
+        communicator = WebsocketCommunicator(application, path)
+        # Stands in for one AuthMiddlewareStack pass per socket.
+        communicator.scope["user"] = user
+        sockets["opened"] += 1
+        return communicator
+
+    async def per_stream(self, application, user, room_ids, sockets):
+        paths = [f"/ws/chat/{room_id}/" for room_id in room_ids]
+        paths.append(f"/ws/notifications/{user.id}/")
+        communicators = [self.open(application, path, user, sockets) for path in paths]
+        for communicator in communicators:
+            connected, _ = await communicator.connect()
+            assert connected
+        for communicator in communicators:
+            await communicator.disconnect()
+
+    async def multiplexed(self, application, user, room_ids, sockets):
+        communicator = self.open(application, "/ws/stream/", user, sockets)
+        connected, _ = await communicator.connect()
+        assert connected
+        streams = [f"chat.{room_id}" for room_id in room_ids] + ["notifications"]
+        for stream in streams:
+            await communicator.send_json_to({"action": "subscribe", "stream": stream})
+            frame = await communicator.receive_json_from()
+            assert frame.get("event") == "subscribed", frame
+        # The notification feed also sends the current unread count.
+        await communicator.receive_json_from()
+        await communicator.disconnect()
@@ -2,6 +2,7 @@
 
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -27,6 +28,17 @@ class ChatMessage(models.Model):
     )
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     content = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the message is received, not when the write-behind buffer flushes.
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     edited_at = models.DateTimeField(null=True, blank=True)
     deleted = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            # Backs keyset pagination of a room's visible history.
+            models.Index(
+                fields=["room", "created_at", "id"],
+                condition=models.Q(deleted=False),
+                name="chat_msg_room_history_idx",
+            ),
+        ]
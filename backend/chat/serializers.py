@@ -0,0 +1,32 @@
+"""Serializers for chat app."""
+
+from rest_framework import serializers
+from .models import ChatRoom, ChatMessage
+
+
+class ChatRoomSerializer(serializers.ModelSerializer):
+    """Serializer for chat rooms."""
+
+    class Meta:
+        model = ChatRoom
+        fields = ("id", "name", "description", "is_private", "created_at")
+        read_only_fields = fields
+
+
+class ChatMessageSerializer(serializers.ModelSerializer):
+    """Serializer for chat history."""
+
+    user_email = serializers.CharField(source="user.email", read_only=True)
+
+    class Meta:
+        model = ChatMessage
+        fields = (
+            "id",
+            "room",
+            "user",
+            "user_email",
+            "content",
+            "created_at",
+            "edited_at",
+        )
+        read_only_fields = fields
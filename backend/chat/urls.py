@@ -1,5 +1,12 @@
 """URLs for chat app."""
 
 from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from . import views
 
-urlpatterns = []
+router = DefaultRouter()
+router.register(r"rooms", views.ChatRoomViewSet, basename="chat-room")
+
+urlpatterns = [
+    path("", include(router.urls)),
+]
@@ -0,0 +1,92 @@
+"""Views for chat app - rooms and message history."""
+
+import base64
+from datetime import datetime
+
+from rest_framework import viewsets, status, permissions
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from django.db.models import Q
+from .models import ChatRoom
+from .serializers import ChatRoomSerializer, ChatMessageSerializer
+
+HISTORY_PAGE_SIZE = 50
+HISTORY_MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(message):
+    """Encode a message's (created_at, id) position as an opaque cursor."""
+    raw = f"{message.created_at.isoformat()}|{message.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Decode a cursor back to (created_at, id); raises ValueError if malformed."""
+    created_at, message_id = (
+        base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+    )
+    return datetime.fromisoformat(created_at), int(message_id)
+
+
+class ChatRoomViewSet(viewsets.ReadOnlyModelViewSet):
+    """ViewSet for chat rooms visible to the current user."""
+
+    serializer_class = ChatRoomSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        """Public rooms plus private rooms the user belongs to."""
+        return (
+            ChatRoom.objects.filter(Q(is_private=False) | Q(members=self.request.user))
+            .distinct()
+            .order_by("name")
+        )
+
+    @action(detail=True, methods=["get"])
+    def messages(self, request, pk=None):
+        """Page backwards through a room's history.
+
+        Pass the returned ``next_cursor`` as ``before`` to load older
+        messages. Seeks on (created_at, id) rather than using OFFSET, so
+        every page costs the same however deep the scrollback goes.
+        """
+        room = self.get_object()
+
+        try:
+            limit = min(
+                int(request.query_params.get("limit", HISTORY_PAGE_SIZE)),
+                HISTORY_MAX_PAGE_SIZE,
+            )
+        except ValueError:
+            limit = HISTORY_PAGE_SIZE
+        limit = max(limit, 1)
+
+        messages = (
+            room.messages.filter(deleted=False)
+            .select_related("user")
+            .order_by("-created_at", "-id")
+        )
+
+        before = request.query_params.get("before")
+        if before:
+            try:
+                created_at, message_id = decode_cursor(before)
+            except ValueError:
+                return Response(
+                    {"error": "Invalid cursor"}, status=status.HTTP_400_BAD_REQUEST
+                )
+            messages = messages.filter(
+                Q(created_at__lt=created_at)
+                | Q(created_at=created_at, id__lt=message_id)
+            )
+
+        page = list(messages[: limit + 1])
+        has_more = len(page) > limit
+        page = page[:limit]
+
+        return Response(
+            {
+                "results": ChatMessageSerializer(page, many=True).data,
+                "next_cursor": encode_cursor(page[-1]) if has_more else None,
+            }
+        )
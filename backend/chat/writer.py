@@ -0,0 +1,170 @@
+"""Write-behind buffer that persists chat messages in batches."""
+
+import asyncio
+import atexit
+import logging
+import time
+from collections import deque
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from config.metrics import registry
+from .models import ChatMessage
+
+logger = logging.getLogger(__name__)
+
+
+class ChatMessageWriter:
+    """Collect chat messages per process and save them with bulk_create.
+
+    ``enqueue`` is synchronous and never touches the database, so the
+    consumer's broadcast path is never blocked. A background task on the
+    event loop flushes when the buffer reaches ``batch_size`` or every
+    ``flush_interval`` seconds, whichever comes first. A batch whose write
+    fails goes back to the front of the buffer and is retried on later
+    flushes, up to ``max_attempts`` writes per message.
+    """
+
+    def __init__(
+        self, batch_size=100, flush_interval=0.5, max_pending=10000, max_attempts=3
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self._pending = deque()
+        self._wakeup = None
+        self._task = None
+
+        self.enqueued_total = 0
+        self.written_total = 0
+        self.dropped_total = 0
+        self.failed_flushes = 0
+        self.flush_count = 0
+        self.last_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+        self.total_flush_seconds = 0.0
+
+    def enqueue(self, room_id, user_id, content):
+        """Buffer a message for the next flush."""
+        if len(self._pending) >= self.max_pending:
+            self._pending.popleft()
+            self.dropped_total += 1
+        self._pending.append(
+            ChatMessage(
+                room_id=room_id,
+                user_id=user_id,
+                content=content,
+                created_at=timezone.now(),
+            )
+        )
+        self.enqueued_total += 1
+        self._ensure_task()
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def _ensure_task(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def _take(self):
+        batch = []
+        while self._pending:
+            batch.append(self._pending.popleft())
+        return batch
+
+    def _requeue(self, batch):
+        """Put a failed batch back ahead of newer messages for a later retry."""
+        retry = []
+        for message in batch:
+            message._write_attempts = getattr(message, "_write_attempts", 0) + 1
+            if message._write_attempts < self.max_attempts:
+                retry.append(message)
+        self.dropped_total += len(batch) - len(retry)
+        self._pending.extendleft(reversed(retry))
+        while len(self._pending) > self.max_pending:
+            self._pending.popleft()
+            self.dropped_total += 1
+        return len(retry)
+
+    async def flush(self):
+        """Write everything currently buffered."""
+        batch = self._take()
+        if batch:
+            await database_sync_to_async(self._write)(batch)
+
+    def flush_sync(self):
+        """Write everything currently buffered from synchronous code."""
+        batch = self._take()
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch):
+        started = time.perf_counter()
+        try:
+            ChatMessage.objects.bulk_create(batch, batch_size=self.batch_size)
+        except Exception:
+            self.failed_flushes += 1
+            retried = self._requeue(batch)
+            logger.exception(
+                "Failed to persist %d chat messages; %d queued for retry",
+                len(batch),
+                retried,
+            )
+            return
+        elapsed = time.perf_counter() - started
+        self.written_total += len(batch)
+        self.flush_count += 1
+        self.last_flush_seconds = elapsed
+        self.total_flush_seconds += elapsed
+        self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+
+    def stats(self):
+        """Counters for queue depth and flush latency."""
+        return {
+            "queue_depth": len(self._pending),
+            "enqueued_total": self.enqueued_total,
+            "written_total": self.written_total,
+            "dropped_total": self.dropped_total,
+            "failed_flushes": self.failed_flushes,
+            "flush_count": self.flush_count,
+            "last_flush_seconds": self.last_flush_seconds,
+            "max_flush_seconds": self.max_flush_seconds,
+            "avg_flush_seconds": (
+                self.total_flush_seconds / self.flush_count if self.flush_count else 0.0
+            ),
+        }
+
+
+writer = ChatMessageWriter(
+    batch_size=settings.CHAT_WRITE_BATCH_SIZE,
+    flush_interval=settings.CHAT_WRITE_FLUSH_INTERVAL,
+)
+atexit.register(writer.flush_sync)
+registry.register_gauge(
+    "chat_writer_queue_depth",
+    "Chat messages waiting to be flushed.",
+    lambda: len(writer._pending),
+)
+registry.register_gauge(
+    "chat_writer_written_total",
+    "Chat messages persisted by this process.",
+    lambda: writer.written_total,
+)
+registry.register_gauge(
+    "chat_writer_last_flush_seconds",
+    "Duration of the most recent chat flush.",
+    lambda: writer.last_flush_seconds,
+)
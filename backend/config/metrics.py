@@ -0,0 +1,187 @@
+"""Per-endpoint request metrics exposed in Prometheus text format.
+
+``MetricsMiddleware`` records request count, latency, DB query count and
+DB time per resolved URL name (DRF routers name these ``<basename>-<action>``,
+e.g. ``ballot-results``). It is a plain synchronous middleware, so under
+ASGI Django runs it on the same thread as the (sync) view and the
+``connection.execute_wrapper`` hook sees that view's queries.
+
+Set ``METRICS_ENABLED`` to turn it on; when off the middleware removes
+itself at startup and costs nothing.
+"""
+
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class EndpointStats:
+    """Accumulated metrics for one endpoint."""
+
+    __slots__ = ("requests", "buckets", "latency_sum", "queries", "db_seconds")
+
+    def __init__(self):
+        self.requests = 0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.latency_sum = 0.0
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+class MetricsRegistry:
+    """Thread-safe, process-local store of endpoint metrics and gauges."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = defaultdict(EndpointStats)
+        self._gauges = {}
+
+    def observe(self, endpoint, seconds, queries, db_seconds):
+        with self._lock:
+            stats = self._endpoints[endpoint]
+            stats.requests += 1
+            stats.latency_sum += seconds
+            stats.queries += queries
+            stats.db_seconds += db_seconds
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    stats.buckets[i] += 1
+                    break
+
+    def register_gauge(self, name, help_text, func):
+        """Expose ``func()`` as a gauge, sampled at scrape time."""
+        self._gauges[name] = (help_text, func)
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def render(self):
+        """Render everything in Prometheus text exposition format."""
+        with self._lock:
+            endpoints = {
+                name: (
+                    stats.requests,
+                    list(stats.buckets),
+                    stats.latency_sum,
+                    stats.queries,
+                    stats.db_seconds,
+                )
+                for name, stats in sorted(self._endpoints.items())
+            }
+
+        lines = [
+            "# HELP rusehac_requests_total Requests handled, by endpoint.",
+            "# TYPE rusehac_requests_total counter",
+        ]
+        for name, (requests, *_rest) in endpoints.items():
+            lines.append(f'rusehac_requests_total{{endpoint="{name}"}} {requests}')
+
+        lines += [
+            "# HELP rusehac_request_duration_seconds Request latency, by endpoint.",
+            "# TYPE rusehac_request_duration_seconds histogram",
+        ]
+        for name, (requests, buckets, latency_sum, _, _) in endpoints.items():
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, buckets):
+                cumulative += count
+                lines.append(
+                    f"rusehac_request_duration_seconds_bucket"
+                    f'{{endpoint="{name}",le="{bound}"}} {cumulative}'
+                )
+            lines += [
+                f'rusehac_request_duration_seconds_bucket{{endpoint="{name}",le="+Inf"}} '
+                f"{requests}",
+                f'rusehac_request_duration_seconds_sum{{endpoint="{name}"}} {latency_sum}',
+                f'rusehac_request_duration_seconds_count{{endpoint="{name}"}} {requests}',
+            ]
+
+        lines += [
+            "# HELP rusehac_db_queries_total Database queries issued, by endpoint.",
+            "# TYPE rusehac_db_queries_total counter",
+        ]
+        for name, (_, _, _, queries, _) in endpoints.items():
+            lines.append(f'rusehac_db_queries_total{{endpoint="{name}"}} {queries}')
+
+        lines += [
+            "# HELP rusehac_db_seconds_total Time spent in database queries, by endpoint.",
+            "# TYPE rusehac_db_seconds_total counter",
+        ]
+        for name, (_, _, _, _, db_seconds) in endpoints.items():
+            lines.append(f'rusehac_db_seconds_total{{endpoint="{name}"}} {db_seconds}')
+
+        for name, (help_text, func) in sorted(self._gauges.items()):
+            lines += [
+                f"# HELP rusehac_{name} {help_text}",
+                f"# TYPE rusehac_{name} gauge",
+                f"rusehac_{name} {func()}",
+            ]
+
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+class QueryCounter:
+    """``execute_wrapper`` hook counting and timing the queries it sees."""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.seconds += time.perf_counter() - started
+
+
+def endpoint_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unresolved"
+    return match.url_name or match.route or match.view_name
+
+
+class MetricsMiddleware:
+    """Record latency and DB usage for every request."""
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            response = self.get_response(request)
+        registry.observe(
+            endpoint_name(request),
+            time.perf_counter() - started,
+            counter.queries,
+            counter.seconds,
+        )
+        return response
+
+
+def metrics_view(request):
+    """Serve the registry in Prometheus text format."""
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    token = settings.METRICS_TOKEN
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -37,6 +37,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "config.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -86,6 +87,22 @@ if DEBUG:
         "NAME": BASE_DIR / "db.sqlite3",
     }
 
+# Passwords are hashed on a bounded process pool (0 workers = inline) with
+# tunable PBKDF2 cost. The pool is per server process, so the total hashing
+# concurrency is PASSWORD_HASH_WORKERS x server processes
+PASSWORD_HASH_WORKERS = config("PASSWORD_HASH_WORKERS", default=2, cast=int)
+PASSWORD_HASH_ITERATIONS = config("PASSWORD_HASH_ITERATIONS", default=600000, cast=int)
+
+PASSWORD_HASHERS = [
+    "accounts.hashers.TunablePBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
+AUTHENTICATION_BACKENDS = ["accounts.backends.PooledModelBackend"]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"
@@ -111,7 +128,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # REST Framework configuration
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.CachedJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
@@ -121,6 +138,24 @@ REST_FRAMEWORK = {
     "PAGE_SIZE": 20,
 }
 
+# Cache: Redis when REDIS_CACHE_URL is set, otherwise per-process memory
+REDIS_CACHE_URL = config("REDIS_CACHE_URL", default="")
+if REDIS_CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_CACHE_URL,
+        }
+    }
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+# Seconds a user's is_active/is_banned/role may be served from cache during
+# JWT authentication. Saves to the user invalidate it at once only where the
+# cache is shared (REDIS_CACHE_URL); with per-process memory, other workers
+# honour a ban or deactivation after at most this many seconds
+AUTH_STATE_CACHE_TTL = config("AUTH_STATE_CACHE_TTL", default=60, cast=int)
+
 # CORS configuration
 CORS_ALLOWED_ORIGINS = config(
     "CORS_ALLOWED_ORIGINS",
@@ -137,6 +172,9 @@ EMAIL_PORT = config("EMAIL_PORT", default=587, cast=int)
 EMAIL_USE_TLS = config("EMAIL_USE_TLS", default=True, cast=bool)
 EMAIL_HOST_USER = config("EMAIL_HOST_USER", default="")
 EMAIL_HOST_PASSWORD = config("EMAIL_HOST_PASSWORD", default="")
+DEFAULT_FROM_EMAIL = config(
+    "DEFAULT_FROM_EMAIL", default="RuseHAC <noreply@rusehac.xyz>"
+)
 
 # Celery Configuration
 CELERY_BROKER_URL = config("CELERY_BROKER_URL", default="redis://localhost:6379/0")
@@ -158,6 +196,42 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Per-endpoint request metrics, served at /api/metrics/
+METRICS_ENABLED = config("METRICS_ENABLED", default=False, cast=bool)
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+
+# Seconds a serialized shop catalog version stays cached; the version comes
+# from the database, so this only bounds memory held by old versions
+SHOP_CATALOG_CACHE_TTL = config("SHOP_CATALOG_CACHE_TTL", default=300, cast=int)
+
+# Shop image variants are built on a background thread pool (0 = inline)
+SHOP_IMAGE_WORKERS = config("SHOP_IMAGE_WORKERS", default=2, cast=int)
+
+# Announcement notifications are fanned out on a background thread pool
+# (0 = inline after commit), inserting and pushing this many users at a time
+NOTIFICATION_FANOUT_WORKERS = config("NOTIFICATION_FANOUT_WORKERS", default=1, cast=int)
+NOTIFICATION_FANOUT_CHUNK_SIZE = config(
+    "NOTIFICATION_FANOUT_CHUNK_SIZE", default=500, cast=int
+)
+
+# Chat messages are persisted by a per-process write-behind buffer
+CHAT_WRITE_BATCH_SIZE = config("CHAT_WRITE_BATCH_SIZE", default=100, cast=int)
+CHAT_WRITE_FLUSH_INTERVAL = config("CHAT_WRITE_FLUSH_INTERVAL", default=0.5, cast=float)
+
+# Retention purge (manage.py purge_expired): days to keep each kind of row
+# (0 = forever), deleted in primary-key batches with a pause between them
+RETENTION_READ_NOTIFICATION_DAYS = config(
+    "RETENTION_READ_NOTIFICATION_DAYS", default=90, cast=int
+)
+RETENTION_UNREAD_NOTIFICATION_DAYS = config(
+    "RETENTION_UNREAD_NOTIFICATION_DAYS", default=365, cast=int
+)
+RETENTION_DELETED_CHAT_DAYS = config(
+    "RETENTION_DELETED_CHAT_DAYS", default=30, cast=int
+)
+RETENTION_BATCH_SIZE = config("RETENTION_BATCH_SIZE", default=1000, cast=int)
+RETENTION_BATCH_PAUSE = config("RETENTION_BATCH_PAUSE", default=0.1, cast=float)
+
 # JWT Configuration
 from datetime import timedelta
 
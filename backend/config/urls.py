@@ -4,16 +4,18 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from .metrics import metrics_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("api/accounts/", include("accounts.urls")),
+    path("api/accounts/", include("accounts.urls_new")),
     path("api/core/", include("core.urls")),
     path("api/shop/", include("shop.urls")),
     path("api/ballots/", include("ballots.urls")),
     path("api/resources/", include("resources.urls")),
     path("api/chat/", include("chat.urls")),
     path("api/notifications/", include("notifications.urls")),
+    path("api/metrics/", metrics_view, name="metrics"),
 ]
 
 if settings.DEBUG:
@@ -1,7 +1,13 @@
 """Admin configuration for core app."""
 
 from django.contrib import admin
-from .models import Announcement, Meeting, Attendance
+from .models import (
+    Announcement,
+    Meeting,
+    Attendance,
+    TermAttendance,
+    TermMeetingCount,
+)
 
 
 @admin.register(Announcement)
@@ -23,3 +29,15 @@ class AttendanceAdmin(admin.ModelAdmin):
     list_display = ("user", "meeting", "marked_at")
     list_filter = ("marked_at", "meeting__date")
     search_fields = ("user__email", "meeting__title")
+
+
+@admin.register(TermAttendance)
+class TermAttendanceAdmin(admin.ModelAdmin):
+    list_display = ("user", "term", "attended")
+    list_filter = ("term",)
+    search_fields = ("user__email",)
+
+
+@admin.register(TermMeetingCount)
+class TermMeetingCountAdmin(admin.ModelAdmin):
+    list_display = ("term", "meeting_count")
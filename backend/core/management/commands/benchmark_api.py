@@ -0,0 +1,371 @@
+"""Seed a large synthetic dataset and benchmark the API endpoints.
+
+Runs against a throwaway test database, never the configured one:
+
+    python manage.py benchmark_api --output bench.json
+    python manage.py benchmark_api --compare bench-main.json
+"""
+
+import json
+import random
+import subprocess
+import time
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ballots.models import Ballot, BallotOption, Vote
+from chat.models import ChatMessage, ChatRoom
+from core.models import Announcement, Attendance, Meeting
+from shop.models import Order, PointTransaction, ShopItem
+
+User = get_user_model()
+
+BATCH_SIZE = 2000
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not samples:
+        return 0.0
+    rank = max(0, min(len(samples) - 1, round(pct / 100 * len(samples)) - 1))
+    return samples[rank]
+
+
+class Command(BaseCommand):
+    help = "Benchmark API endpoints against a large synthetic dataset."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=3000)
+        parser.add_argument("--meetings", type=int, default=300)
+        parser.add_argument("--attendance", type=int, default=30000)
+        parser.add_argument("--ballots", type=int, default=50)
+        parser.add_argument("--options", type=int, default=4)
+        parser.add_argument("--votes", type=int, default=20000)
+        parser.add_argument("--transactions", type=int, default=30000)
+        parser.add_argument("--items", type=int, default=30)
+        parser.add_argument("--orders", type=int, default=2000)
+        parser.add_argument("--rooms", type=int, default=10)
+        parser.add_argument("--messages", type=int, default=50000)
+        parser.add_argument(
+            "--iterations", type=int, default=50, help="Requests per endpoint."
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--output", help="Write results as JSON to this path.")
+        parser.add_argument(
+            "--compare", help="Previous JSON results to print deltas against."
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            started = time.perf_counter()
+            dataset = self.seed(options)
+            seed_seconds = time.perf_counter() - started
+            self.stdout.write(f"Seeded {dataset} in {seed_seconds:.1f}s")
+            endpoints = self.run_endpoints(options["iterations"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        results = {
+            "commit": self.git_commit(),
+            "timestamp": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "iterations": options["iterations"],
+            "dataset": dataset,
+            "seed_seconds": round(seed_seconds, 2),
+            "endpoints": endpoints,
+        }
+
+        self.report(endpoints, options["compare"])
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def seed(self, options):
+        """Bulk-insert the synthetic dataset and rebuild derived counters."""
+        rng = self.rng
+        now = timezone.now()
+        password = make_password("benchmark-pass")
+        year_groups = [choice for choice, _ in User.YearGroup.choices]
+
+        User.objects.bulk_create(
+            [
+                User(
+                    username=f"bench{i}@example.com",
+                    email=f"bench{i}@example.com",
+                    first_name=f"First{i}",
+                    last_name=f"Last{i}",
+                    year_group=rng.choice(year_groups),
+                    role=User.Role.EXEC if i < 10 else User.Role.MEMBER,
+                    password=password,
+                )
+                for i in range(options["users"])
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        user_ids = list(User.objects.order_by("id").values_list("id", flat=True))
+        self.exec_id, self.member_id = user_ids[0], user_ids[-1]
+
+        Announcement.objects.bulk_create(
+            [
+                Announcement(
+                    title=f"Announcement {i}",
+                    content="Lorem ipsum " * 20,
+                    author_id=self.exec_id,
+                    pinned=i < 3,
+                )
+                for i in range(100)
+            ]
+        )
+
+        Meeting.objects.bulk_create(
+            [
+                Meeting(
+                    title=f"Meeting {i}",
+                    date=now - timedelta(days=rng.randint(0, 730)),
+                    created_by_id=self.exec_id,
+                )
+                for i in range(options["meetings"])
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        meeting_ids = list(Meeting.objects.values_list("id", flat=True))
+        per_meeting = min(
+            len(user_ids), options["attendance"] // max(1, len(meeting_ids))
+        )
+        Attendance.objects.bulk_create(
+            [
+                Attendance(user_id=user_id, meeting_id=meeting_id)
+                for meeting_id in meeting_ids
+                for user_id in rng.sample(user_ids, per_meeting)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+        Ballot.objects.bulk_create(
+            [
+                Ballot(
+                    title=f"Ballot {i}",
+                    description="Benchmark ballot",
+                    created_by_id=self.exec_id,
+                    closing_date=now + timedelta(days=rng.choice([-7, 7])),
+                )
+                for i in range(options["ballots"])
+            ]
+        )
+        ballot_ids = list(Ballot.objects.values_list("id", flat=True))
+        BallotOption.objects.bulk_create(
+            [
+                BallotOption(ballot_id=ballot_id, text=f"Option {n}")
+                for ballot_id in ballot_ids
+                for n in range(options["options"])
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        options_by_ballot = {}
+        for option_id, ballot_id in BallotOption.objects.values_list("id", "ballot_id"):
+            options_by_ballot.setdefault(ballot_id, []).append(option_id)
+        per_ballot = min(len(user_ids), options["votes"] // max(1, len(ballot_ids)))
+        Vote.objects.bulk_create(
+            [
+                Vote(
+                    ballot_id=ballot_id,
+                    user_id=user_id,
+                    option_id=rng.choice(options_by_ballot[ballot_id]),
+                )
+                for ballot_id in ballot_ids
+                for user_id in rng.sample(user_ids, per_ballot)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        for ballot in Ballot.objects.filter(closing_date__lt=now):
+            ballot.close_ballot()
+
+        PointTransaction.objects.bulk_create(
+            [
+                PointTransaction(
+                    user_id=rng.choice(user_ids),
+                    amount=rng.randint(1, 50),
+                    reason="Benchmark award",
+                    awarded_by_id=self.exec_id,
+                )
+                for _ in range(options["transactions"])
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+        ShopItem.objects.bulk_create(
+            [
+                ShopItem(
+                    name=f"Item {i}",
+                    description="Benchmark merch",
+                    cost=rng.randint(10, 200),
+                    image=f"shop_items/item{i}.jpg",
+                )
+                for i in range(options["items"])
+            ]
+        )
+        item_ids = list(ShopItem.objects.values_list("id", flat=True))
+        Order.objects.bulk_create(
+            [
+                Order(
+                    user_id=rng.choice(user_ids),
+                    item_id=rng.choice(item_ids),
+                    status=rng.choice(Order.Status.values),
+                )
+                for _ in range(options["orders"])
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+        ChatRoom.objects.bulk_create(
+            [
+                ChatRoom(name=f"room{i}", created_by_id=self.exec_id)
+                for i in range(options["rooms"])
+            ]
+        )
+        room_ids = list(ChatRoom.objects.values_list("id", flat=True))
+        self.room_id = room_ids[0]
+        ChatMessage.objects.bulk_create(
+            [
+                ChatMessage(
+                    room_id=rng.choice(room_ids),
+                    user_id=rng.choice(user_ids),
+                    content=f"Message {i}",
+                    created_at=now - timedelta(seconds=options["messages"] - i),
+                    deleted=rng.random() < 0.02,
+                )
+                for i in range(options["messages"])
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+        # bulk_create bypasses the hooks that maintain derived counters.
+        call_command("rebuild_point_balances", stdout=StringIO())
+        call_command("rebuild_term_attendance", stdout=StringIO())
+        call_command("build_member_search", stdout=StringIO())
+
+        self.ballot_id = ballot_ids[0]
+        return {
+            "users": len(user_ids),
+            "meetings": len(meeting_ids),
+            "attendance": Attendance.objects.count(),
+            "ballots": len(ballot_ids),
+            "votes": Vote.objects.count(),
+            "transactions": options["transactions"],
+            "orders": options["orders"],
+            "messages": options["messages"],
+        }
+
+    def endpoints(self):
+        """(name, user id, path) for every benchmarked request."""
+        member, exec_ = self.member_id, self.exec_id
+        return [
+            ("user-me", member, "/api/accounts/users/me/"),
+            ("user-search", member, "/api/accounts/users/search/?q=Last12"),
+            ("announcement-list", member, "/api/core/announcements/"),
+            ("meeting-list", member, "/api/core/meetings/"),
+            ("attendance-my-stats", member, "/api/core/attendance/my_stats/"),
+            ("attendance-leaderboard", member, "/api/core/attendance/leaderboard/"),
+            ("ballot-list", member, "/api/ballots/ballots/"),
+            (
+                "ballot-results",
+                member,
+                f"/api/ballots/ballots/{self.ballot_id}/results/",
+            ),
+            ("shopitem-list", member, "/api/shop/items/"),
+            (
+                "pointtransaction-my-balance",
+                member,
+                "/api/shop/point-transactions/my_balance/",
+            ),
+            ("order-list", exec_, "/api/shop/orders/"),
+            ("chat-room-messages", member, f"/api/chat/rooms/{self.room_id}/messages/"),
+        ]
+
+    def run_endpoints(self, iterations):
+        clients = {}
+        results = {}
+        for name, user_id, path in self.endpoints():
+            if user_id not in clients:
+                client = APIClient()
+                token = RefreshToken.for_user(User.objects.get(pk=user_id)).access_token
+                client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+                clients[user_id] = client
+            client = clients[user_id]
+
+            client.get(path)  # warm up
+            latencies, queries = [], []
+            status_code = None
+            for _ in range(iterations):
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    response = client.get(path)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                queries.append(len(captured))
+                status_code = response.status_code
+
+            latencies.sort()
+            results[name] = {
+                "status": status_code,
+                "p50_ms": round(percentile(latencies, 50), 3),
+                "p95_ms": round(percentile(latencies, 95), 3),
+                "p99_ms": round(percentile(latencies, 99), 3),
+                "mean_ms": round(sum(latencies) / len(latencies), 3),
+                "queries": round(sum(queries) / len(queries), 2),
+                "max_queries": max(queries),
+            }
+        return results
+
+    def report(self, endpoints, compare_path):
+        previous = {}
+        if compare_path:
+            with open(compare_path) as fh:
+                previous = json.load(fh)["endpoints"]
+
+        header = f"{'endpoint':<30}{'status':>7}{'p50':>10}{'p95':>10}{'p99':>10}{'queries':>9}"
+        if previous:
+            header += f"{'Δp95':>10}{'Δqueries':>10}"
+        self.stdout.write(header)
+        for name, row in endpoints.items():
+            line = (
+                f"{name:<30}{row['status']:>7}{row['p50_ms']:>10.2f}"
+                f"{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}{row['queries']:>9}"
+            )
+            if name in previous:
+                before = previous[name]
+                line += (
+                    f"{row['p95_ms'] - before['p95_ms']:>+10.2f}"
+                    f"{row['queries'] - before['queries']:>+10.2f}"
+                )
+            self.stdout.write(line)
@@ -0,0 +1,44 @@
+"""Delete expired notifications and soft-deleted chat messages in batches.
+
+Meant to run from cron, e.g. nightly:
+
+    python manage.py purge_expired
+    python manage.py purge_expired --only deleted_chat_messages --batch-size 500
+"""
+
+from django.core.management.base import BaseCommand
+
+from core import retention
+
+
+class Command(BaseCommand):
+    help = "Purge rows past their retention TTL in throttled primary-key batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--only",
+            action="append",
+            choices=sorted(retention.policies()),
+            help="Purge only this policy (repeatable).",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, help="Primary-key range per delete."
+        )
+        parser.add_argument(
+            "--pause", type=float, help="Seconds to sleep between batches."
+        )
+
+    def handle(self, *args, **options):
+        results = retention.run(
+            names=options["only"],
+            batch_size=options["batch_size"],
+            pause=options["pause"],
+        )
+        self.stdout.write(f"{'policy':<24}{'removed':>9}{'batches':>9}{'seconds':>9}")
+        for name, stats in results.items():
+            self.stdout.write(
+                f"{name:<24}{stats['removed']:>9}{stats['batches']:>9}"
+                f"{stats['seconds']:>9.2f}"
+            )
+        total = sum(stats["removed"] for stats in results.values())
+        self.stdout.write(self.style.SUCCESS(f"Removed {total} expired rows."))
@@ -0,0 +1,126 @@
+"""Rebuild per-term attendance and meeting counters from the raw tables."""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from core.models import (
+    Attendance,
+    Meeting,
+    TermAttendance,
+    TermMeetingCount,
+    term_bounds,
+    term_start_for,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute TermAttendance and TermMeetingCount rows from Attendance and "
+        "Meeting and report mismatches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--term",
+            type=int,
+            help="Academic year the term starts in (e.g. 2025); default: all terms.",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report mismatches; exit non-zero if any are found.",
+        )
+
+    def handle(self, *args, **options):
+        if options["term"]:
+            terms = [date(options["term"], 9, 1)]
+        else:
+            terms = sorted(
+                {
+                    term_start_for(month)
+                    for month in Meeting.objects.dates("date", "month")
+                }
+                | set(TermAttendance.objects.values_list("term", flat=True).distinct())
+                | set(TermMeetingCount.objects.values_list("term", flat=True))
+            )
+
+        mismatches = 0
+        for term in terms:
+            mismatches += self.rebuild_term(term, check_only=options["check"])
+
+        if options["check"] and mismatches:
+            self.stderr.write(
+                self.style.ERROR(
+                    f"{mismatches} term counters disagree with Attendance."
+                )
+            )
+            raise SystemExit(1)
+
+        verb = "Found" if options["check"] else "Fixed"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {mismatches} mismatched counters across {len(terms)} terms."
+            )
+        )
+
+    def rebuild_term(self, term, check_only):
+        start, end = term_bounds(term)
+        mismatches = 0
+        with transaction.atomic():
+            meeting_count = Meeting.objects.filter(
+                date__gte=start, date__lt=end
+            ).count()
+            stored_count = TermMeetingCount.for_term(term)
+            if stored_count != meeting_count:
+                mismatches += 1
+                self.stdout.write(
+                    f"{term:%Y} meetings: stored {stored_count}, actual {meeting_count}"
+                )
+                if not check_only:
+                    TermMeetingCount.objects.update_or_create(
+                        term=term, defaults={"meeting_count": meeting_count}
+                    )
+
+            expected = dict(
+                Attendance.objects.filter(
+                    meeting__date__gte=start, meeting__date__lt=end
+                )
+                .values("user")
+                .annotate(total=Count("id"))
+                .values_list("user", "total")
+            )
+            stored = {
+                row.user_id: row
+                for row in TermAttendance.objects.select_for_update().filter(term=term)
+            }
+
+            to_create, to_update, to_delete = [], [], []
+            for user_id in expected.keys() | stored.keys():
+                count = expected.get(user_id, 0)
+                row = stored.get(user_id)
+                current = row.attended if row else None
+                if current == count or (row is None and not count):
+                    continue
+                self.stdout.write(
+                    f"{term:%Y} user {user_id}: stored {current}, actual {count}"
+                )
+                if row is None:
+                    to_create.append(
+                        TermAttendance(term=term, user_id=user_id, attended=count)
+                    )
+                elif not count:
+                    to_delete.append(row.pk)
+                else:
+                    row.attended = count
+                    to_update.append(row)
+
+            if not check_only:
+                TermAttendance.objects.bulk_create(to_create, batch_size=500)
+                TermAttendance.objects.bulk_update(
+                    to_update, ["attended"], batch_size=500
+                )
+                TermAttendance.objects.filter(pk__in=to_delete).delete()
+
+        return mismatches + len(to_create) + len(to_update) + len(to_delete)
@@ -1,11 +1,32 @@
 """Models for core app - attendance and club data."""
 
-from django.db import models
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, time
+
+from django.db import models, transaction
+from django.db.models import F
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 User = get_user_model()
 
 
+def term_start_for(when):
+    """Return the start date (1 September) of the academic term containing ``when``."""
+    year = when.year if when.month >= 9 else when.year - 1
+    return date(year, 9, 1)
+
+
+def term_bounds(term):
+    """Return the aware [start, end) datetimes of the term starting on ``term``."""
+    start = timezone.make_aware(datetime.combine(term, time.min))
+    end = timezone.make_aware(
+        datetime.combine(term.replace(year=term.year + 1), time.min)
+    )
+    return start, end
+
+
 class Announcement(models.Model):
     """Club announcements created by execs."""
 
@@ -25,6 +46,33 @@ class Announcement(models.Model):
         return self.title
 
 
+# Meetings being deleted on this thread. Their attendees' term counts are
+# decremented once in core.signals.meeting_deleting, so the cascaded
+# Attendance deletes skip the per-row decrement.
+_deleting = threading.local()
+
+
+def meetings_being_deleted():
+    if not hasattr(_deleting, "ids"):
+        _deleting.ids = set()
+    return _deleting.ids
+
+
+@contextmanager
+def deleting_meetings(meeting_ids):
+    """Forget ``meeting_ids`` once their delete finishes, even if it fails."""
+    try:
+        yield
+    finally:
+        meetings_being_deleted().difference_update(meeting_ids)
+
+
+class MeetingQuerySet(models.QuerySet):
+    def delete(self):
+        with deleting_meetings(list(self.values_list("pk", flat=True))):
+            return super().delete()
+
+
 class Meeting(models.Model):
     """Club meeting for attendance tracking."""
 
@@ -36,12 +84,18 @@ class Meeting(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = MeetingQuerySet.as_manager()
+
     class Meta:
         ordering = ["-date"]
 
     def __str__(self):
         return f'{self.title} - {self.date.strftime("%Y-%m-%d")}'
 
+    def delete(self, *args, **kwargs):
+        with deleting_meetings([self.pk]):
+            return super().delete(*args, **kwargs)
+
 
 class Attendance(models.Model):
     """Record of user attendance at meetings."""
@@ -62,3 +116,126 @@ class Attendance(models.Model):
 
     def __str__(self):
         return f"{self.user.email} - {self.meeting.title}"
+
+    @classmethod
+    def bulk_mark(cls, meeting, user_ids, marked_by):
+        """Mark many users as attending in a constant number of queries.
+
+        Returns a dict of ``created``, ``skipped`` (already marked) and
+        ``invalid`` (unknown, inactive or malformed) user ids.
+        """
+        ids, invalid = [], []
+        for raw in user_ids:
+            try:
+                ids.append(int(raw))
+            except (TypeError, ValueError):
+                invalid.append(raw)
+        ids = list(dict.fromkeys(ids))
+
+        with transaction.atomic():
+            # Lock the meeting row so concurrent markings of the same meeting
+            # serialize and the created/skipped split below stays exact.
+            Meeting.objects.select_for_update().filter(pk=meeting.pk).exists()
+
+            valid = set(
+                User.objects.filter(id__in=ids, is_active=True).values_list(
+                    "id", flat=True
+                )
+            )
+            existing = set(
+                cls.objects.filter(meeting=meeting, user_id__in=valid).values_list(
+                    "user_id", flat=True
+                )
+            )
+            created = [user_id for user_id in ids if user_id in valid - existing]
+            cls.objects.bulk_create(
+                [
+                    cls(user_id=user_id, meeting=meeting, marked_by=marked_by)
+                    for user_id in created
+                ],
+                batch_size=500,
+                ignore_conflicts=True,
+            )
+            # bulk_create skips post_save, so update the term counters here.
+            TermAttendance.increment(term_start_for(meeting.date), created)
+
+        return {
+            "created": created,
+            "skipped": [user_id for user_id in ids if user_id in existing],
+            "invalid": invalid + [user_id for user_id in ids if user_id not in valid],
+        }
+
+
+class TermAttendance(models.Model):
+    """Per-user attendance count for one academic term, maintained incrementally.
+
+    Rows are created and bumped as attendance is marked (see core.signals);
+    run ``rebuild_term_attendance`` to backfill or repair them.
+    """
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="term_attendance"
+    )
+    term = models.DateField()
+    attended = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("term", "user")
+        indexes = [
+            models.Index(fields=["term", "-attended"], name="core_term_leaderboard_idx")
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.term:%Y}: {self.attended}"
+
+    @classmethod
+    def increment(cls, term, user_ids, delta=1):
+        """Add ``delta`` to each user's count for ``term`` in two queries."""
+        if not user_ids:
+            return
+        with transaction.atomic():
+            cls.objects.bulk_create(
+                [cls(term=term, user_id=user_id) for user_id in user_ids],
+                batch_size=500,
+                ignore_conflicts=True,
+            )
+            cls.objects.filter(term=term, user_id__in=user_ids).update(
+                attended=F("attended") + delta
+            )
+
+    @classmethod
+    def decrement(cls, term, user_ids):
+        """Subtract one from existing counts; never creates rows."""
+        cls.objects.filter(term=term, user_id__in=user_ids).update(
+            attended=F("attended") - 1
+        )
+
+
+class TermMeetingCount(models.Model):
+    """Number of meetings scheduled in each academic term."""
+
+    term = models.DateField(primary_key=True)
+    meeting_count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.term:%Y}: {self.meeting_count} meetings"
+
+    @classmethod
+    def increment(cls, term):
+        with transaction.atomic():
+            cls.objects.get_or_create(term=term)
+            cls.objects.filter(term=term).update(meeting_count=F("meeting_count") + 1)
+
+    @classmethod
+    def decrement(cls, term):
+        cls.objects.filter(term=term).update(meeting_count=F("meeting_count") - 1)
+
+    @classmethod
+    def for_term(cls, term):
+        """Return the meeting count for ``term`` with a primary-key lookup."""
+        return (
+            cls.objects.filter(term=term)
+            .values_list("meeting_count", flat=True)
+            .first()
+            or 0
+        )
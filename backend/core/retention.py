@@ -0,0 +1,125 @@
+"""Retention purge for rows that are never read again.
+
+Old notifications and soft-deleted chat messages would otherwise grow
+their tables (and indexes) forever. Each policy names a queryset and a TTL
+in days from settings; ``purge`` seeks through the expired rows
+RETENTION_BATCH_SIZE primary keys at a time, deleting each batch's key
+range in its own short transaction and pausing RETENTION_BATCH_PAUSE
+seconds after every batch that removed rows, so no lock is held for long
+and other writers get a turn. A TTL of 0 keeps that kind of row forever.
+"""
+
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from chat.models import ChatMessage
+from notifications.fanout import schedule_unread_push
+from notifications.models import Notification, UnreadCount
+
+
+def policies():
+    """Return {name: (queryset, ttl_days, counts_unread)} for every policy."""
+    return {
+        "read_notifications": (
+            Notification.objects.filter(read=True),
+            settings.RETENTION_READ_NOTIFICATION_DAYS,
+            False,
+        ),
+        "unread_notifications": (
+            Notification.objects.filter(read=False),
+            settings.RETENTION_UNREAD_NOTIFICATION_DAYS,
+            True,
+        ),
+        "deleted_chat_messages": (
+            ChatMessage.objects.filter(deleted=True),
+            settings.RETENTION_DELETED_CHAT_DAYS,
+            False,
+        ),
+    }
+
+
+def purge(rows, ttl_days, counts_unread=False, batch_size=None, pause=None, now=None):
+    """Delete rows older than ``ttl_days`` in primary-key batches.
+
+    Returns a dict with the rows removed, batches run and seconds taken.
+    """
+    batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+    pause = settings.RETENTION_BATCH_PAUSE if pause is None else pause
+    stats = {"removed": 0, "batches": 0, "seconds": 0.0}
+    if ttl_days <= 0:
+        return stats
+
+    started = time.perf_counter()
+    cutoff = (now or timezone.now()) - timedelta(days=ttl_days)
+    expired = rows.filter(created_at__lt=cutoff)
+    # Fix the upper bound up front: rows expiring mid-run wait for the next run.
+    high = expired.aggregate(high=Max("pk"))["high"]
+    if high is not None:
+        expired = expired.filter(pk__lte=high)
+        last = None
+        removed = 0
+        while True:
+            # Seek straight to the next expired rows, however sparse they are.
+            pending = expired.order_by("pk")
+            if last is not None:
+                pending = pending.filter(pk__gt=last)
+            pks = list(pending.values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                break
+            if removed:
+                time.sleep(pause)
+            batch = expired.filter(pk__gte=pks[0], pk__lte=pks[-1])
+            with transaction.atomic():
+                if counts_unread:
+                    removed = _delete_unread(batch)
+                else:
+                    removed = batch.delete()[0]
+            stats["removed"] += removed
+            stats["batches"] += 1
+            last = pks[-1]
+
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+def _delete_unread(batch):
+    """Delete a batch of unread notifications and take them off the counters."""
+    rows = list(batch.select_for_update().values_list("pk", "user_id"))
+    if not rows:
+        return 0
+    Notification.objects.filter(pk__in=[pk for pk, _ in rows]).delete()
+
+    per_user = defaultdict(int)
+    for _, user_id in rows:
+        per_user[user_id] += 1
+    # One counter UPDATE per distinct amount rather than per user.
+    by_amount = defaultdict(list)
+    for user_id, removed in per_user.items():
+        by_amount[removed].append(user_id)
+    for removed, user_ids in by_amount.items():
+        UnreadCount.apply(user_ids, -removed)
+    schedule_unread_push(per_user)
+    return len(rows)
+
+
+def run(names=None, batch_size=None, pause=None, now=None):
+    """Purge every policy (or just ``names``); returns {name: stats}."""
+    results = {}
+    for name, (rows, ttl_days, counts_unread) in policies().items():
+        if names and name not in names:
+            continue
+        results[name] = purge(
+            rows,
+            ttl_days,
+            counts_unread=counts_unread,
+            batch_size=batch_size,
+            pause=pause,
+            now=now,
+        )
+    return results
@@ -0,0 +1,71 @@
+"""Signal handlers keeping core's derived counters in step with attendance."""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from .models import (
+    Attendance,
+    Meeting,
+    TermAttendance,
+    TermMeetingCount,
+    meetings_being_deleted,
+    term_start_for,
+)
+
+
+@receiver(post_save, sender=Attendance)
+def attendance_saved(sender, instance, created, **kwargs):
+    if created:
+        TermAttendance.increment(
+            term_start_for(instance.meeting.date), [instance.user_id]
+        )
+
+
+@receiver(post_delete, sender=Attendance)
+def attendance_deleted(sender, instance, **kwargs):
+    if instance.meeting_id in meetings_being_deleted():
+        return
+    TermAttendance.decrement(term_start_for(instance.meeting.date), [instance.user_id])
+
+
+@receiver(pre_save, sender=Meeting)
+def meeting_saving(sender, instance, **kwargs):
+    instance._previous_date = (
+        Meeting.objects.filter(pk=instance.pk).values_list("date", flat=True).first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=Meeting)
+def meeting_saved(sender, instance, created, **kwargs):
+    if created:
+        TermMeetingCount.increment(term_start_for(instance.date))
+        return
+
+    previous = getattr(instance, "_previous_date", None)
+    if previous is None:
+        return
+    old_term, new_term = term_start_for(previous), term_start_for(instance.date)
+    if old_term == new_term:
+        return
+    # The meeting moved to another term; move it and its attendance along.
+    attendees = list(instance.attendances.values_list("user_id", flat=True))
+    with transaction.atomic():
+        TermMeetingCount.decrement(old_term)
+        TermMeetingCount.increment(new_term)
+        TermAttendance.decrement(old_term, attendees)
+        TermAttendance.increment(new_term, attendees)
+
+
+@receiver(pre_delete, sender=Meeting)
+def meeting_deleting(sender, instance, **kwargs):
+    attendees = list(instance.attendances.values_list("user_id", flat=True))
+    TermAttendance.decrement(term_start_for(instance.date), attendees)
+    meetings_being_deleted().add(instance.pk)
+
+
+@receiver(post_delete, sender=Meeting)
+def meeting_deleted(sender, instance, **kwargs):
+    meetings_being_deleted().discard(instance.pk)
+    TermMeetingCount.decrement(term_start_for(instance.date))
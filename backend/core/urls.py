@@ -2,7 +2,7 @@
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import views_new as views
 
 router = DefaultRouter()
 router.register(r"announcements", views.AnnouncementViewSet, basename="announcement")
@@ -5,7 +5,15 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.utils import timezone
 from datetime import timedelta
-from .models import Announcement, Meeting, Attendance
+from notifications.fanout import schedule_announcement
+from .models import (
+    Announcement,
+    Meeting,
+    Attendance,
+    TermAttendance,
+    TermMeetingCount,
+    term_start_for,
+)
 from .serializers_new import (
     AnnouncementSerializer,
     MeetingSerializer,
@@ -39,7 +47,8 @@ class AnnouncementViewSet(viewsets.ModelViewSet):
     ordering = ["-pinned", "-created_at"]
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        announcement = serializer.save(author=self.request.user)
+        schedule_announcement(announcement)
 
     @action(
         detail=True, methods=["post"], permission_classes=[permissions.IsAuthenticated]
@@ -83,29 +92,21 @@ class MeetingViewSet(viewsets.ModelViewSet):
         meeting = self.get_object()
         user_ids = request.data.get("user_ids", [])
 
-        if not user_ids:
+        if not user_ids or not isinstance(user_ids, list):
             return Response(
                 {"error": "user_ids required"}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        from django.contrib.auth import get_user_model
-
-        User = get_user_model()
-
-        created_count = 0
-        for user_id in user_ids:
-            try:
-                user = User.objects.get(id=user_id, is_active=True)
-                _, created = Attendance.objects.get_or_create(
-                    user=user, meeting=meeting, defaults={"marked_by": request.user}
-                )
-                if created:
-                    created_count += 1
-            except User.DoesNotExist:
-                pass
+        result = Attendance.bulk_mark(meeting, user_ids, request.user)
 
         return Response(
-            {"created": created_count, "attendance_count": meeting.attendances.count()},
+            {
+                "created": len(result["created"]),
+                "created_ids": result["created"],
+                "skipped_ids": result["skipped"],
+                "invalid_ids": result["invalid"],
+                "attendance_count": meeting.attendances.count(),
+            },
             status=status.HTTP_201_CREATED,
         )
 
@@ -127,21 +128,16 @@ class AttendanceViewSet(viewsets.ReadOnlyModelViewSet):
 
     @action(detail=False, methods=["get"])
     def my_stats(self, request):
-        """Get current user's attendance stats."""
-        user = request.user
-        today = timezone.now()
-
-        # Calculate from start of current academic term (September)
-        current_year = today.year
-        if today.month < 9:
-            term_start = today.replace(year=current_year - 1, month=9, day=1)
-        else:
-            term_start = today.replace(month=9, day=1)
-
-        total_meetings = Meeting.objects.filter(date__gte=term_start).count()
-        attended = Attendance.objects.filter(
-            user=user, meeting__date__gte=term_start
-        ).count()
+        """Get current user's attendance stats from the term counters."""
+        term = term_start_for(timezone.now())
+
+        total_meetings = TermMeetingCount.for_term(term)
+        attended = (
+            TermAttendance.objects.filter(term=term, user=request.user)
+            .values_list("attended", flat=True)
+            .first()
+            or 0
+        )
 
         if total_meetings == 0:
             percentage = 0
@@ -166,46 +162,31 @@ class AttendanceViewSet(viewsets.ReadOnlyModelViewSet):
 
     @action(detail=False, methods=["get"])
     def leaderboard(self, request):
-        """Get attendance leaderboard (top attendees)."""
-        from django.db.models import Count, Q
-        from django.contrib.auth import get_user_model
-
-        User = get_user_model()
-        today = timezone.now()
-
-        current_year = today.year
-        if today.month < 9:
-            term_start = today.replace(year=current_year - 1, month=9, day=1)
-        else:
-            term_start = today.replace(month=9, day=1)
-
-        total_meetings = Meeting.objects.filter(date__gte=term_start).count()
+        """Get attendance leaderboard (top attendees) from the term counters."""
+        term = term_start_for(timezone.now())
+        total_meetings = TermMeetingCount.for_term(term)
 
         if total_meetings == 0:
             return Response([])
 
-        # Get users with attendance count
-        users = (
-            User.objects.filter(is_active=True, is_banned=False)
-            .annotate(
-                attended_count=Count(
-                    "attendance_records",
-                    filter=Q(attendance_records__meeting__date__gte=term_start),
-                )
+        rows = (
+            TermAttendance.objects.filter(
+                term=term, user__is_active=True, user__is_banned=False
             )
-            .order_by("-attended_count")[:20]
+            .select_related("user")
+            .order_by("-attended", "user_id")[:20]
         )
 
         leaderboard_data = [
             {
-                "id": user.id,
-                "email": user.email,
-                "name": f"{user.first_name} {user.last_name}".strip(),
-                "attended": user.attended_count,
+                "id": row.user.id,
+                "email": row.user.email,
+                "name": f"{row.user.first_name} {row.user.last_name}".strip(),
+                "attended": row.attended,
                 "total": total_meetings,
-                "percentage": round((user.attended_count / total_meetings * 100), 2),
+                "percentage": round((row.attended / total_meetings * 100), 2),
             }
-            for user in users
+            for row in rows
         ]
 
         return Response(leaderboard_data)
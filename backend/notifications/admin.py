@@ -1,7 +1,7 @@
 """Admin for notifications app."""
 
 from django.contrib import admin
-from .models import Notification
+from .models import Notification, UnreadCount
 
 
 @admin.register(Notification)
@@ -16,3 +16,10 @@ class NotificationAdmin(admin.ModelAdmin):
     )
     list_filter = ("read", "email_sent", "notification_type", "created_at")
     search_fields = ("user__email", "title", "content")
+
+
+@admin.register(UnreadCount)
+class UnreadCountAdmin(admin.ModelAdmin):
+    list_display = ("user", "unread")
+    search_fields = ("user__email",)
+    readonly_fields = ("user", "unread")
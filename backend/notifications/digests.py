@@ -0,0 +1,96 @@
+"""Email digests of unsent notifications.
+
+One query streams every unsent notification of opted-in members, ordered
+by user, so each member gets a single digest however many notifications
+piled up. Digests go out over one SMTP connection in chunks via
+``send_messages``, and each delivered chunk's rows are marked
+``email_sent`` with one UPDATE.
+"""
+
+import logging
+import time
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import render_to_string
+
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 50
+
+
+def pending_notifications():
+    """Unsent notifications of active, opted-in members, grouped by user."""
+    return (
+        Notification.objects.filter(
+            email_sent=False,
+            user__email_notifications=True,
+            user__is_active=True,
+            user__is_banned=False,
+        )
+        .select_related("user")
+        .order_by("user_id", "created_at", "id")
+        .iterator(chunk_size=2000)
+    )
+
+
+def build_digest(user, notifications):
+    count = len(notifications)
+    subject = (
+        notifications[0].title
+        if count == 1
+        else f"{count} new notifications from RuseHAC"
+    )
+    body = render_to_string(
+        "notifications/digest_email.txt",
+        {"user": user, "notifications": notifications},
+    )
+    return EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [user.email])
+
+
+def send_digests(connection=None, chunk_size=CHUNK_SIZE, dry_run=False):
+    """Send one digest per member with unsent notifications.
+
+    A chunk that fails to send is left unmarked and retried on the next
+    run; sending stops there because the connection is usually gone.
+    Returns counts and timings.
+    """
+    stats = {"digests": 0, "notifications": 0, "failed": 0, "seconds": 0.0}
+    started = time.perf_counter()
+    if dry_run:
+        connection = get_connection("django.core.mail.backends.dummy.EmailBackend")
+    connection = connection or get_connection()
+
+    batch, batch_ids = [], []
+    with connection:
+        for user_id, rows in groupby(pending_notifications(), key=lambda n: n.user_id):
+            rows = list(rows)
+            batch.append(build_digest(rows[0].user, rows))
+            batch_ids.extend(row.id for row in rows)
+            if len(batch) >= chunk_size:
+                if not _send_chunk(connection, batch, batch_ids, stats, dry_run):
+                    break
+                batch, batch_ids = [], []
+        else:
+            if batch:
+                _send_chunk(connection, batch, batch_ids, stats, dry_run)
+
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+def _send_chunk(connection, messages, notification_ids, stats, dry_run):
+    if not dry_run:
+        try:
+            connection.send_messages(messages)
+        except Exception:
+            logger.exception("Digest chunk of %d emails failed", len(messages))
+            stats["failed"] += len(messages)
+            return False
+        Notification.objects.filter(id__in=notification_ids).update(email_sent=True)
+    stats["digests"] += len(messages)
+    stats["notifications"] += len(notification_ids)
+    return True
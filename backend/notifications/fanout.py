@@ -0,0 +1,224 @@
+"""Fan an announcement out to every member as Notification rows and pushes.
+
+``schedule_announcement`` queues the job on a small background pool once
+the announcement commits, so the exec's request returns immediately. The
+job walks active members in chunks: each chunk is written with one
+``bulk_create`` plus one UPDATE of the members' unread counters, and pushed
+to its ``notifications_<user_id>`` groups with one batch of concurrent
+``group_send`` calls. With
+NOTIFICATION_FANOUT_WORKERS = 0 the job runs inline after commit instead.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections, transaction
+
+from .models import Notification, UnreadCount
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def notification_payload(notification):
+    return {
+        "id": notification.id,
+        "title": notification.title,
+        "content": notification.content,
+        "notification_type": str(notification.notification_type),
+        "read": notification.read,
+        "created_at": notification.created_at.isoformat(),
+    }
+
+
+async def _send_batch(channel_layer, messages):
+    results = await asyncio.gather(
+        *[
+            channel_layer.group_send(f"notifications_{user_id}", message)
+            for user_id, message in messages
+        ],
+        return_exceptions=True,
+    )
+    return sum(1 for result in results if isinstance(result, Exception))
+
+
+def _send(messages):
+    """Send (user_id, message) pairs to the users' groups; returns failures."""
+    channel_layer = get_channel_layer()
+    if channel_layer is None or not messages:
+        return 0
+    try:
+        return async_to_sync(_send_batch)(channel_layer, messages)
+    except Exception:
+        logger.exception("Notification push failed for %d users", len(messages))
+        return len(messages)
+
+
+def push(notifications, unread_counts=None):
+    """Send a batch of notifications to their users' groups; returns failures.
+
+    ``unread_counts`` maps user ids to their new unread count, which rides
+    along with the notification so the bell updates without another event.
+    """
+    unread_counts = unread_counts or {}
+    messages = []
+    for notification in notifications:
+        message = {
+            "type": "notification",
+            "notification": notification_payload(notification),
+        }
+        if notification.user_id in unread_counts:
+            message["unread_count"] = unread_counts[notification.user_id]
+        messages.append((notification.user_id, message))
+    return _send(messages)
+
+
+def push_unread_counts(user_ids):
+    """Push the current unread count to each user's open sockets."""
+    counts = UnreadCount.counts_for(user_ids)
+    return _send(
+        [
+            (user_id, {"type": "unread.count", "unread_count": unread})
+            for user_id, unread in counts.items()
+        ]
+    )
+
+
+def schedule_unread_push(user_ids):
+    """Push the users' unread counts once the current transaction commits."""
+    user_ids = list(user_ids)
+    transaction.on_commit(lambda: push_unread_counts(user_ids))
+
+
+def fan_out(title, content, notification_type, recipients, chunk_size=None):
+    """Write and push one notification per recipient id, chunk by chunk.
+
+    Returns a dict of counts and timings for the run.
+    """
+    chunk_size = chunk_size or settings.NOTIFICATION_FANOUT_CHUNK_SIZE
+    stats = {
+        "recipients": 0,
+        "push_failures": 0,
+        "insert_seconds": 0.0,
+        "push_seconds": 0.0,
+    }
+    started = time.perf_counter()
+
+    chunk = []
+    for user_id in recipients:
+        chunk.append(user_id)
+        if len(chunk) >= chunk_size:
+            _fan_out_chunk(title, content, notification_type, chunk, stats)
+            chunk = []
+    if chunk:
+        _fan_out_chunk(title, content, notification_type, chunk, stats)
+
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+def _fan_out_chunk(title, content, notification_type, user_ids, stats):
+    started = time.perf_counter()
+    with transaction.atomic():
+        notifications = Notification.objects.bulk_create(
+            [
+                Notification(
+                    user_id=user_id,
+                    title=title,
+                    content=content,
+                    notification_type=notification_type,
+                )
+                for user_id in user_ids
+            ]
+        )
+        UnreadCount.apply(user_ids, 1)
+    unread_counts = UnreadCount.counts_for(user_ids)
+    inserted = time.perf_counter()
+    stats["push_failures"] += push(notifications, unread_counts)
+    stats["recipients"] += len(notifications)
+    stats["insert_seconds"] += inserted - started
+    stats["push_seconds"] += time.perf_counter() - inserted
+
+
+def member_ids(exclude=None):
+    """Ids of active, unbanned members, streamed in primary-key order."""
+    members = User.objects.filter(is_active=True, is_banned=False).order_by("id")
+    if exclude is not None:
+        members = members.exclude(id=exclude)
+    return members.values_list("id", flat=True).iterator(chunk_size=2000)
+
+
+def fan_out_announcement(announcement_id):
+    from core.models import Announcement
+
+    announcement = Announcement.objects.filter(pk=announcement_id).first()
+    if announcement is None:
+        return None
+    stats = fan_out(
+        announcement.title,
+        announcement.content,
+        Notification.Type.ANNOUNCEMENT,
+        member_ids(exclude=announcement.author_id),
+    )
+    logger.info(
+        "Announcement %s notified %d members in %.2fs",
+        announcement_id,
+        stats["recipients"],
+        stats["seconds"],
+    )
+    return stats
+
+
+def _fan_out_announcement_safely(announcement_id):
+    try:
+        fan_out_announcement(announcement_id)
+    except Exception:
+        logger.exception("Fan-out failed for announcement %s", announcement_id)
+
+
+def _fan_out_in_worker(announcement_id):
+    close_old_connections()
+    try:
+        _fan_out_announcement_safely(announcement_id)
+    finally:
+        close_old_connections()
+
+
+def get_pool():
+    """Return the shared fan-out pool, or None when fanning out inline."""
+    global _pool
+    if settings.NOTIFICATION_FANOUT_WORKERS <= 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=settings.NOTIFICATION_FANOUT_WORKERS,
+                    thread_name_prefix="notification-fanout",
+                )
+    return _pool
+
+
+def schedule_announcement(announcement):
+    """Notify every member about ``announcement`` once it commits."""
+    announcement_id = announcement.pk
+
+    def submit():
+        pool = get_pool()
+        if pool is None:
+            _fan_out_announcement_safely(announcement_id)
+        else:
+            pool.submit(_fan_out_in_worker, announcement_id)
+
+    transaction.on_commit(submit)
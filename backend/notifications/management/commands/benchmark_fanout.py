@@ -0,0 +1,135 @@
+"""Measure announcement fan-out throughput for a few thousand recipients.
+
+Runs against a throwaway test database, never the configured one:
+
+    python manage.py benchmark_fanout --recipients 5000 --chunk-sizes 100,500,2000
+    python manage.py benchmark_fanout --memory-layer --baseline
+"""
+
+import time
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import (
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from notifications import fanout
+from notifications.models import Notification
+
+User = get_user_model()
+
+MEMORY_LAYER = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+
+
+class Command(BaseCommand):
+    help = "Benchmark announcement fan-out into Notification rows and pushes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recipients", type=int, default=3000)
+        parser.add_argument("--chunk-sizes", default="100,500,2000")
+        parser.add_argument(
+            "--memory-layer",
+            action="store_true",
+            help="Push through an in-memory channel layer instead of the "
+            "configured one (no Redis needed).",
+        )
+        parser.add_argument(
+            "--baseline",
+            action="store_true",
+            help="Also time one create() and one group_send per recipient.",
+        )
+
+    def handle(self, *args, **options):
+        chunk_sizes = [int(size) for size in options["chunk_sizes"].split(",")]
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with override_settings(
+                **({"CHANNEL_LAYERS": MEMORY_LAYER} if options["memory_layer"] else {})
+            ):
+                self.run(options["recipients"], chunk_sizes, options["baseline"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def run(self, recipients, chunk_sizes, baseline):
+        User.objects.bulk_create(
+            [
+                User(
+                    username=f"fanout{i}@example.com",
+                    email=f"fanout{i}@example.com",
+                    year_group=User.YearGroup.YEAR_10,
+                )
+                for i in range(recipients)
+            ],
+            batch_size=2000,
+        )
+        self.stdout.write(
+            f"{recipients} recipients\n"
+            f"{'mode':<14}{'seconds':>9}{'insert':>9}{'push':>9}{'rows/s':>10}"
+            f"{'failed':>8}"
+        )
+
+        if baseline:
+            self.report("per-row", self.per_row())
+        for chunk_size in chunk_sizes:
+            Notification.objects.all().delete()
+            stats = fanout.fan_out(
+                "Benchmark",
+                "Benchmark announcement",
+                Notification.Type.ANNOUNCEMENT,
+                fanout.member_ids(),
+                chunk_size=chunk_size,
+            )
+            self.report(f"chunk={chunk_size}", stats)
+
+    def per_row(self):
+        """One INSERT and one group_send per member, as a naive loop would."""
+        Notification.objects.all().delete()
+        channel_layer = get_channel_layer()
+        stats = {
+            "recipients": 0,
+            "push_failures": 0,
+            "insert_seconds": 0.0,
+            "push_seconds": 0.0,
+        }
+        started = time.perf_counter()
+        for user_id in fanout.member_ids():
+            step = time.perf_counter()
+            notification = Notification.objects.create(
+                user_id=user_id,
+                title="Benchmark",
+                content="Benchmark announcement",
+                notification_type=Notification.Type.ANNOUNCEMENT,
+            )
+            inserted = time.perf_counter()
+            try:
+                async_to_sync(channel_layer.group_send)(
+                    f"notifications_{user_id}",
+                    {
+                        "type": "notification",
+                        "notification": fanout.notification_payload(notification),
+                    },
+                )
+            except Exception:
+                stats["push_failures"] += 1
+            stats["insert_seconds"] += inserted - step
+            stats["push_seconds"] += time.perf_counter() - inserted
+            stats["recipients"] += 1
+        stats["seconds"] = time.perf_counter() - started
+        return stats
+
+    def report(self, mode, stats):
+        self.stdout.write(
+            f"{mode:<14}{stats['seconds']:>9.2f}{stats['insert_seconds']:>9.2f}"
+            f"{stats['push_seconds']:>9.2f}"
+            f"{stats['recipients'] / stats['seconds']:>10.0f}"
+            f"{stats['push_failures']:>8}"
+        )
@@ -0,0 +1,57 @@
+"""Rebuild materialized unread notification counts from the feed."""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from notifications.models import Notification, UnreadCount
+
+
+class Command(BaseCommand):
+    help = "Recompute UnreadCount rows from unread notifications and report drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drift without writing corrected counts.",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+
+        with transaction.atomic():
+            feed = dict(
+                Notification.objects.filter(read=False)
+                .values("user")
+                .annotate(total=Count("id"))
+                .values_list("user", "total")
+            )
+            stored = {
+                row.user_id: row for row in UnreadCount.objects.select_for_update()
+            }
+
+            to_create = []
+            to_update = []
+            for user_id in feed.keys() | stored.keys():
+                expected = feed.get(user_id, 0)
+                row = stored.get(user_id)
+                if row is None:
+                    to_create.append(UnreadCount(user_id=user_id, unread=expected))
+                elif row.unread != expected:
+                    self.stdout.write(
+                        f"user {user_id}: stored {row.unread}, feed {expected}"
+                    )
+                    row.unread = expected
+                    to_update.append(row)
+
+            if not dry_run:
+                UnreadCount.objects.bulk_create(to_create, batch_size=500)
+                UnreadCount.objects.bulk_update(to_update, ["unread"], batch_size=500)
+
+        verb = "Would fix" if dry_run else "Fixed"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {len(to_update)} drifted and {len(to_create)} missing "
+                f"counts across {len(feed)} users."
+            )
+        )
@@ -0,0 +1,61 @@
+"""Email each opted-in member one digest of their unsent notifications."""
+
+import smtplib
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand, CommandError
+from notifications.digests import CHUNK_SIZE, send_digests
+
+
+class Command(BaseCommand):
+    help = "Send notification digest emails over one SMTP connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Render digests without sending or marking anything.",
+        )
+        parser.add_argument(
+            "--smtp",
+            metavar="HOST:PORT",
+            help="Send through this plain SMTP server (e.g. a local stand-in) "
+            "instead of the configured email backend.",
+        )
+
+    def handle(self, *args, **options):
+        connection = None
+        if options["smtp"]:
+            host, _, port = options["smtp"].rpartition(":")
+            connection = get_connection(
+                "django.core.mail.backends.smtp.EmailBackend",
+                host=host,
+                port=int(port),
+                username="",
+                password="",
+                use_tls=False,
+                use_ssl=False,
+            )
+
+        try:
+            stats = send_digests(
+                connection=connection,
+                chunk_size=options["chunk_size"],
+                dry_run=options["dry_run"],
+            )
+        except (OSError, smtplib.SMTPException) as exc:
+            raise CommandError(f"Could not open the mail connection: {exc}")
+
+        rate = stats["digests"] / stats["seconds"] if stats["seconds"] else 0
+        verb = "Rendered" if options["dry_run"] else "Sent"
+        self.stdout.write(
+            f"{verb} {stats['digests']} digests covering "
+            f"{stats['notifications']} notifications in {stats['seconds']:.2f}s "
+            f"({rate:.0f} messages/s)"
+        )
+        if stats["failed"]:
+            self.stderr.write(
+                self.style.ERROR(f"{stats['failed']} digests failed; rerun to retry.")
+            )
+            raise SystemExit(1)
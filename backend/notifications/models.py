@@ -1,6 +1,7 @@
 """Models for notifications app."""
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -29,3 +30,122 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "read", "created_at"], name="notifications_feed_idx"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.title}"
+
+    def save(self, *args, **kwargs):
+        """Save the notification and count it if it arrives unread."""
+        if self._state.adding and not self.read:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                UnreadCount.apply([self.user_id], 1)
+        else:
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            if not self.read:
+                UnreadCount.apply([self.user_id], -1)
+            return result
+
+    @classmethod
+    def mark_read(cls, user, ids=None):
+        """Mark a user's unread notifications (or only ``ids``) as read.
+
+        One UPDATE on the feed and one on the counter; returns how many
+        notifications changed.
+        """
+        user_id = getattr(user, "pk", user)
+        with transaction.atomic():
+            unread = cls.objects.filter(user_id=user_id, read=False)
+            if ids is not None:
+                unread = unread.filter(pk__in=ids)
+            marked = unread.update(read=True)
+            if marked:
+                UnreadCount.apply([user_id], -marked)
+        return marked
+
+
+class UnreadCount(models.Model):
+    """Materialized number of unread notifications per user.
+
+    Kept in step with every write that creates, reads or deletes unread
+    notifications, so the bell icon never has to COUNT the feed.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="unread_notification_count",
+    )
+    unread = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id} - {self.unread} unread"
+
+    @classmethod
+    def apply(cls, user_ids, delta):
+        """Add delta to each user's counter; call after the feed write, in its
+        transaction.
+
+        Existing counters move with one UPDATE. Missing rows are seeded from
+        the feed, which already reflects the write, so counters heal for
+        users that predate the table.
+        """
+        user_ids = set(user_ids)
+        updated = cls.objects.filter(user_id__in=user_ids).update(
+            unread=F("unread") + delta
+        )
+        if updated < len(user_ids):
+            cls.seed(user_ids)
+
+    @classmethod
+    def seed(cls, user_ids):
+        """Create missing rows from the feed in a fixed number of queries."""
+        missing = set(user_ids) - set(
+            cls.objects.filter(user_id__in=user_ids).values_list("user_id", flat=True)
+        )
+        if not missing:
+            return
+        counts = dict(
+            Notification.objects.filter(user_id__in=missing, read=False)
+            .values("user")
+            .annotate(total=Count("id"))
+            .values_list("user", "total")
+        )
+        cls.objects.bulk_create(
+            [
+                cls(user_id=user_id, unread=counts.get(user_id, 0))
+                for user_id in missing
+            ],
+            batch_size=500,
+            ignore_conflicts=True,
+        )
+
+    @classmethod
+    def counts_for(cls, user_ids):
+        """Return {user_id: unread} for seeded counters."""
+        return dict(
+            cls.objects.filter(user_id__in=user_ids).values_list("user_id", "unread")
+        )
+
+    @classmethod
+    def for_user(cls, user):
+        """Return a user's unread count with a single primary-key lookup."""
+        user_id = getattr(user, "pk", user)
+        unread = (
+            cls.objects.filter(user_id=user_id).values_list("unread", flat=True).first()
+        )
+        if unread is None:
+            with transaction.atomic():
+                cls.seed([user_id])
+            unread = cls.objects.get(user_id=user_id).unread
+        return unread
@@ -0,0 +1,13 @@
+"""Serializers for notifications app."""
+
+from rest_framework import serializers
+from .models import Notification
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    """Serializer for a user's notification feed."""
+
+    class Meta:
+        model = Notification
+        fields = ("id", "title", "content", "notification_type", "read", "created_at")
+        read_only_fields = fields
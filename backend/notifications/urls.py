@@ -1,5 +1,12 @@
 """URLs for notifications app."""
 
 from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from . import views
 
-urlpatterns = []
+router = DefaultRouter()
+router.register(r"", views.NotificationViewSet, basename="notification")
+
+urlpatterns = [
+    path("", include(router.urls)),
+]
@@ -0,0 +1,48 @@
+"""Views for notifications app - the feed and unread counts."""
+
+from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from .fanout import schedule_unread_push
+from .models import Notification, UnreadCount
+from .serializers import NotificationSerializer
+
+
+class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
+    """The current user's notifications, newest first.
+
+    ``?unread=true`` limits the feed to unread notifications; both forms
+    are served from the (user, read, created_at) index.
+    """
+
+    serializer_class = NotificationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        notifications = Notification.objects.filter(user=self.request.user)
+        if self.request.query_params.get("unread") in ("1", "true"):
+            notifications = notifications.filter(read=False)
+        return notifications.order_by("-created_at", "-id")
+
+    @action(detail=False, methods=["get"])
+    def unread_count(self, request):
+        """Unread count for the bell icon, from the per-user counter."""
+        return Response({"unread_count": UnreadCount.for_user(request.user)})
+
+    @action(detail=True, methods=["post"])
+    def mark_read(self, request, pk=None):
+        """Mark one notification as read."""
+        notification = self.get_object()
+        if Notification.mark_read(request.user, ids=[notification.pk]):
+            schedule_unread_push([request.user.pk])
+        return Response({"unread_count": UnreadCount.for_user(request.user)})
+
+    @action(detail=False, methods=["post"])
+    def mark_all_read(self, request):
+        """Mark every unread notification as read."""
+        marked = Notification.mark_read(request.user)
+        if marked:
+            schedule_unread_push([request.user.pk])
+        return Response(
+            {"marked": marked, "unread_count": UnreadCount.for_user(request.user)}
+        )
@@ -1,7 +1,14 @@
 """Admin for shop app."""
 
 from django.contrib import admin
-from .models import ShopItem, Order, PointTransaction
+from .models import (
+    ShopItem,
+    Order,
+    PointTransaction,
+    PointBalance,
+    PointSnapshot,
+    PointAward,
+)
 
 
 @admin.register(ShopItem)
@@ -13,9 +20,10 @@ class ShopItemAdmin(admin.ModelAdmin):
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
-    list_display = ("user", "item", "status", "created_at")
+    list_display = ("user", "item", "status", "points_held", "created_at")
     list_filter = ("status", "created_at")
     search_fields = ("user__email", "item__name")
+    readonly_fields = ("points_held",)
 
 
 @admin.register(PointTransaction)
@@ -23,3 +31,53 @@ class PointTransactionAdmin(admin.ModelAdmin):
     list_display = ("user", "amount", "reason", "created_at")
     list_filter = ("created_at",)
     search_fields = ("user__email", "reason")
+
+    def get_readonly_fields(self, request, obj=None):
+        # The balance only follows inserts and per-row deletes; correct a
+        # recorded amount with a compensating transaction instead.
+        if obj is not None:
+            return ("user", "amount")
+        return ()
+
+    def has_delete_permission(self, request, obj=None):
+        # Compacted rows are part of the audited ledger.
+        if obj is not None and obj.is_compacted():
+            return False
+        return super().has_delete_permission(request, obj)
+
+    def get_actions(self, request):
+        # A bulk selection can mix in compacted rows; delete row by row so
+        # has_delete_permission checks each one.
+        actions = super().get_actions(request)
+        actions.pop("delete_selected", None)
+        return actions
+
+
+@admin.register(PointBalance)
+class PointBalanceAdmin(admin.ModelAdmin):
+    list_display = ("user", "balance", "reserved", "updated_at")
+    search_fields = ("user__email",)
+    readonly_fields = ("user", "balance", "reserved", "updated_at")
+
+
+@admin.register(PointSnapshot)
+class PointSnapshotAdmin(admin.ModelAdmin):
+    list_display = ("user", "term", "period_total", "transaction_count", "balance")
+    list_filter = ("term",)
+    search_fields = ("user__email",)
+    readonly_fields = (
+        "user",
+        "term",
+        "period_total",
+        "transaction_count",
+        "balance",
+        "created_at",
+    )
+
+
+@admin.register(PointAward)
+class PointAwardAdmin(admin.ModelAdmin):
+    list_display = ("reason", "amount", "meeting", "awarded_by", "created_at")
+    list_filter = ("created_at",)
+    search_fields = ("reason", "idempotency_key")
+    readonly_fields = ("idempotency_key", "fingerprint", "created_at")
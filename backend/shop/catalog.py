@@ -0,0 +1,38 @@
+"""Versioned cache of the serialized shop catalog.
+
+The catalog changes a few times a term but is read on every shop page. Its
+version is derived from the database (number of items and the latest
+``updated_at``), so every server process agrees on it without a shared
+cache: any save, delete or new image variant moves it on. The serialized
+list of available items is cached under that version; old versions are
+never read again and simply expire.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+
+def get_version():
+    """Return the current catalog version with one aggregate query."""
+    from .models import ShopItem
+
+    state = ShopItem.objects.aggregate(items=Count("id"), latest=Max("updated_at"))
+    latest = state["latest"]
+    stamp = int(latest.timestamp() * 1_000_000) if latest else 0
+    return f"{state['items']}-{stamp}"
+
+
+def catalog_key(version, base_url):
+    # Item URLs are absolute, so cache per scheme and host.
+    return f"shop:catalog:{version}:{base_url}"
+
+
+def get_catalog(version, request, build):
+    """Return the serialized catalog for ``version``, calling ``build`` on a miss."""
+    key = catalog_key(version, request.build_absolute_uri("/"))
+    catalog = cache.get(key)
+    if catalog is None:
+        catalog = build()
+        cache.set(key, catalog, settings.SHOP_CATALOG_CACHE_TTL)
+    return catalog
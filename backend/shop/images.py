@@ -0,0 +1,170 @@
+"""Resized WebP variants of shop item images.
+
+Uploads are often multi-megabyte phone photos. After an item's image
+changes, ``schedule`` queues the item on a small thread pool (Pillow
+releases the GIL while resizing and encoding) that writes one stripped
+WebP per entry in VARIANTS and records their names and sizes on
+``ShopItem.image_variants``. With SHOP_IMAGE_WORKERS = 0 the variants are
+built inline after the transaction commits instead.
+"""
+
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Variant name -> bounding box (width, height); aspect ratio is kept
+VARIANTS = {
+    "thumb": (200, 200),
+    "medium": (600, 600),
+    "large": (1200, 1200),
+}
+WEBP_QUALITY = 80
+VARIANT_DIR = "shop_items/variants"
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def variant_name(item_pk, source_name, variant):
+    """Storage name for one variant, unique to the item and its source image.
+
+    ``foo.jpg`` and ``foo.png`` (or two items uploading ``foo.jpg``) must not
+    share a file, so the name carries the item pk and a hash of the full
+    source name rather than just its stem.
+    """
+    digest = hashlib.sha1(source_name.encode()).hexdigest()[:12]
+    return f"{VARIANT_DIR}/{item_pk}-{digest}-{variant}.webp"
+
+
+def _owned_by(item_pk, name):
+    # Only names this module wrote for the item; older stem-based names may
+    # be shared with other items and are left in place.
+    return name.startswith(f"{VARIANT_DIR}/{item_pk}-")
+
+
+def render_variants(source):
+    """Return {variant: (webp_bytes, width, height)} for an open image file."""
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+    rendered = {}
+    for variant, box in VARIANTS.items():
+        resized = image.copy()
+        resized.thumbnail(box, Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        # A fresh save without exif/icc arguments strips the metadata.
+        resized.save(buffer, "WEBP", quality=WEBP_QUALITY, method=4)
+        rendered[variant] = (buffer.getvalue(), resized.width, resized.height)
+    return rendered
+
+
+def generate(item):
+    """Write every variant for ``item`` and record them; returns the mapping.
+
+    This item's variants of a previous image are deleted. If the image
+    changed again while this ran, the stale result is discarded.
+    """
+    from .models import ShopItem
+
+    source_name = item.image.name
+    storage = item.image.storage
+    if not source_name:
+        variants = {}
+    else:
+        with storage.open(source_name, "rb") as fh:
+            rendered = render_variants(fh)
+        variants = {"source": source_name}
+        for variant, (data, width, height) in rendered.items():
+            name = variant_name(item.pk, source_name, variant)
+            if storage.exists(name):
+                storage.delete(name)
+            variants[variant] = {
+                "name": storage.save(name, ContentFile(data)),
+                "width": width,
+                "height": height,
+            }
+
+    previous = item.image_variants or {}
+    updated = ShopItem.objects.filter(pk=item.pk, image=source_name).update(
+        image_variants=variants, updated_at=timezone.now()
+    )
+    stale = previous if updated else variants
+    for variant in VARIANTS:
+        entry = stale.get(variant)
+        if (
+            entry
+            and entry["name"] != (variants.get(variant) or {}).get("name")
+            and _owned_by(item.pk, entry["name"])
+        ):
+            storage.delete(entry["name"])
+    if updated:
+        item.image_variants = variants
+    return variants
+
+
+def needs_variants(item):
+    return (item.image_variants or {}).get("source") != (item.image.name or None)
+
+
+def _generate_by_id(item_id):
+    from .models import ShopItem
+
+    try:
+        item = ShopItem.objects.filter(pk=item_id).first()
+        if item is not None and needs_variants(item):
+            generate(item)
+    except FileNotFoundError:
+        logger.warning(
+            "Shop item %s image %s is missing; no variants built",
+            item_id,
+            item.image.name,
+        )
+    except Exception:
+        logger.exception("Failed to build image variants for shop item %s", item_id)
+
+
+def _generate_in_worker(item_id):
+    close_old_connections()
+    try:
+        _generate_by_id(item_id)
+    finally:
+        close_old_connections()
+
+
+def get_pool():
+    """Return the shared variant pool, or None when building inline."""
+    global _pool
+    if settings.SHOP_IMAGE_WORKERS <= 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=settings.SHOP_IMAGE_WORKERS,
+                    thread_name_prefix="shop-images",
+                )
+    return _pool
+
+
+def schedule(item_id):
+    """Build an item's variants in the background once the save commits."""
+
+    def submit():
+        pool = get_pool()
+        if pool is None:
+            _generate_by_id(item_id)
+        else:
+            pool.submit(_generate_in_worker, item_id)
+
+    transaction.on_commit(submit)
@@ -0,0 +1,50 @@
+"""Fold ended academic terms of the points ledger into per-user snapshots."""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from core.models import term_start_for
+from shop.models import PointSnapshot, PointTransaction
+
+
+class Command(BaseCommand):
+    help = (
+        "Write PointSnapshot rows for every ended term that has not been "
+        "compacted yet, oldest first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--until",
+            type=int,
+            help="Stop after the term starting in this year (e.g. 2024).",
+        )
+
+    def handle(self, *args, **options):
+        compacted_until = PointSnapshot.compacted_until()
+        pending = PointTransaction.objects.all()
+        if compacted_until:
+            pending = pending.filter(created_at__gte=compacted_until)
+        first = (
+            pending.order_by("created_at").values_list("created_at", flat=True).first()
+        )
+        if first is None:
+            self.stdout.write(self.style.SUCCESS("Nothing to compact."))
+            return
+
+        last = term_start_for(timezone.now()).year - 1
+        if options["until"] is not None:
+            last = min(last, options["until"])
+
+        total = 0
+        for year in range(term_start_for(first).year, last + 1):
+            term = date(year, 9, 1)
+            try:
+                written = PointSnapshot.compact(term)
+            except ValueError as exc:
+                raise CommandError(exc)
+            total += written
+            self.stdout.write(f"{term:%Y}: {written} snapshots")
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {total} snapshots."))
@@ -0,0 +1,78 @@
+"""Rebuild materialized point balances and holds from the ledger and orders."""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+from shop.models import Order, PointBalance, PointTransaction
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute PointBalance rows from the ledger and open orders and report "
+        "any drift."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drift without writing corrected balances.",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+
+        with transaction.atomic():
+            ledger = dict(
+                PointTransaction.objects.values("user")
+                .annotate(total=Sum("amount"))
+                .values_list("user", "total")
+            )
+            holds = dict(
+                Order.objects.filter(status__in=Order.OPEN_STATUSES)
+                .values("user")
+                .annotate(total=Sum("points_held"))
+                .values_list("user", "total")
+            )
+            stored = {
+                row.user_id: row
+                for row in PointBalance.objects.select_for_update().all()
+            }
+
+            to_create = []
+            to_update = []
+            for user_id in ledger.keys() | holds.keys() | stored.keys():
+                expected = ledger.get(user_id) or 0
+                held = holds.get(user_id) or 0
+                row = stored.get(user_id)
+                if row is None:
+                    if expected or held:
+                        self.stdout.write(
+                            f"user {user_id}: missing (ledger {expected}, "
+                            f"held {held})"
+                        )
+                    to_create.append(
+                        PointBalance(user_id=user_id, balance=expected, reserved=held)
+                    )
+                elif row.balance != expected or row.reserved != held:
+                    self.stdout.write(
+                        f"user {user_id}: stored {row.balance} "
+                        f"(reserved {row.reserved}), ledger {expected} "
+                        f"(held {held})"
+                    )
+                    row.balance, row.reserved = expected, held
+                    to_update.append(row)
+
+            if not dry_run:
+                PointBalance.objects.bulk_create(to_create, batch_size=500)
+                PointBalance.objects.bulk_update(
+                    to_update, ["balance", "reserved"], batch_size=500
+                )
+
+        verb = "Would fix" if dry_run else "Fixed"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {len(to_update)} drifted and {len(to_create)} missing "
+                f"balances across {len(ledger)} users."
+            )
+        )
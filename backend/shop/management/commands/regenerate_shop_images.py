@@ -0,0 +1,38 @@
+"""Rebuild the resized WebP variants of shop item images."""
+
+from django.core.management.base import BaseCommand
+from shop import images
+from shop.models import ShopItem
+
+
+class Command(BaseCommand):
+    help = "Regenerate WebP image variants for shop items."
+
+    def add_arguments(self, parser):
+        parser.add_argument("item_ids", nargs="*", type=int)
+        parser.add_argument(
+            "--missing",
+            action="store_true",
+            help="Only items whose variants are missing or out of date.",
+        )
+
+    def handle(self, *args, **options):
+        items = ShopItem.objects.exclude(image="").order_by("id")
+        if options["item_ids"]:
+            items = items.filter(id__in=options["item_ids"])
+
+        built = failed = 0
+        for item in items.iterator():
+            if options["missing"] and not images.needs_variants(item):
+                continue
+            try:
+                images.generate(item)
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f"item {item.id} ({item.image.name}): {exc}")
+            else:
+                built += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Regenerated {built} items, {failed} failed.")
+        )
@@ -0,0 +1,178 @@
+"""Hammer the shop claim flow from many threads and check nothing overspends.
+
+Runs against a throwaway test database, never the configured one:
+
+    python manage.py stress_shop_claims --threads 32 --attempts 20
+"""
+
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Sum
+from django.test.utils import setup_test_environment, teardown_test_environment
+from rest_framework.test import APIClient
+
+from shop.models import Order, PointBalance, PointTransaction, ShopItem
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Stress concurrent shop claims, approvals and rejections for overspend."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument(
+            "--attempts", type=int, default=10, help="Claims per thread."
+        )
+        parser.add_argument("--balance", type=int, default=1000)
+        parser.add_argument("--cost", type=int, default=30)
+
+    def handle(self, *args, **options):
+        # Rejected claims are expected; keep 4xx warnings out of the output.
+        logging.getLogger("django.request").setLevel(logging.ERROR)
+
+        test_settings = connection.settings_dict.setdefault("TEST", {})
+        tmpdir = None
+        if connection.vendor == "sqlite" and not test_settings.get("NAME"):
+            # Threads need a shared on-disk database, not per-connection memory.
+            tmpdir = tempfile.mkdtemp()
+            test_settings["NAME"] = os.path.join(tmpdir, "stress.sqlite3")
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            failures = self.run_stress(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+            if tmpdir:
+                test_settings.pop("NAME")
+                os.rmdir(tmpdir)
+
+        if failures:
+            for failure in failures:
+                self.stderr.write(self.style.ERROR(failure))
+            raise SystemExit(1)
+        self.stdout.write(self.style.SUCCESS("No overspend or double spend."))
+
+    def run_stress(self, options):
+        balance, cost = options["balance"], options["cost"]
+        member = User.objects.create(
+            username="stress@example.com", email="stress@example.com", year_group="Y12"
+        )
+        exec_ = User.objects.create(
+            username="exec@example.com",
+            email="exec@example.com",
+            year_group="Y13",
+            role=User.Role.EXEC,
+        )
+        PointTransaction.objects.create(
+            user=member, amount=balance, reason="Stress seed", awarded_by=exec_
+        )
+        item = ShopItem.objects.create(
+            name="Stress item", description="", cost=cost, image=""
+        )
+
+        # Phase 1: every thread tries to claim repeatedly at once.
+        def claim(client):
+            return client.post(
+                "/api/shop/orders/claim_item/", {"item_id": item.id}, format="json"
+            ).status_code
+
+        statuses, elapsed = self.race(
+            member,
+            [claim] * (options["threads"] * options["attempts"]),
+            options["threads"],
+        )
+        claimed = statuses[201]
+        self.stdout.write(
+            f"claims: {dict(statuses)} in {elapsed:.2f}s "
+            f"({sum(statuses.values()) / elapsed:.0f}/s)"
+        )
+
+        failures = []
+        totals = PointBalance.totals_for(member)
+        held = (
+            Order.objects.filter(status__in=Order.OPEN_STATUSES).aggregate(
+                total=Sum("points_held")
+            )["total"]
+            or 0
+        )
+        expected = min(balance // cost, options["threads"] * options["attempts"])
+        if claimed != expected or set(statuses) - {201, 400}:
+            failures.append(f"claims {dict(statuses)}, expected {expected} to succeed")
+        if totals != (balance, claimed * cost) or held != claimed * cost:
+            failures.append(f"after claims: balance/reserved {totals}, held {held}")
+
+        # Phase 2: approve everything, then race hand-over against rejection.
+        Order.objects.update(status=Order.Status.APPROVED)
+        order_ids = list(Order.objects.values_list("id", flat=True))
+
+        def close(path):
+            return lambda client: client.post(path).status_code
+
+        calls = [
+            close(f"/api/shop/orders/{order_id}/{verb}/")
+            for order_id in order_ids
+            for verb in ("mark_claimed", "reject", "mark_claimed", "reject")
+        ]
+        statuses, elapsed = self.race(exec_, calls, options["threads"])
+        self.stdout.write(f"hand-over/reject: {dict(statuses)} in {elapsed:.2f}s")
+
+        outcomes = Counter(Order.objects.values_list("status", flat=True))
+        spent = -(
+            PointTransaction.objects.filter(amount__lt=0).aggregate(
+                total=Sum("amount")
+            )["total"]
+            or 0
+        )
+        totals = PointBalance.totals_for(member)
+        if statuses[200] != len(order_ids):
+            failures.append(f"{statuses[200]} closes succeeded for {len(order_ids)}")
+        if spent != outcomes[Order.Status.CLAIMED] * cost:
+            failures.append(
+                f"spent {spent} for {outcomes[Order.Status.CLAIMED]} claimed orders"
+            )
+        if totals != (balance - spent, 0):
+            failures.append(f"after hand-over: balance/reserved {totals}")
+        self.stdout.write(f"orders: {dict(outcomes)}, final balance/reserved {totals}")
+        return failures
+
+    def race(self, user, calls, threads):
+        """Run ``calls`` across ``threads`` clients as user; count status codes."""
+        statuses = Counter()
+        lock = threading.Lock()
+        pending = iter(calls)
+        start = threading.Barrier(threads)
+
+        def worker():
+            client = APIClient()
+            client.force_authenticate(user)
+            start.wait()
+            try:
+                while True:
+                    with lock:
+                        call = next(pending, None)
+                    if call is None:
+                        return
+                    code = call(client)
+                    with lock:
+                        statuses[code] += 1
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return statuses, time.perf_counter() - started
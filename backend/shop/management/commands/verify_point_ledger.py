@@ -0,0 +1,90 @@
+"""Replay the raw points ledger and check it against the snapshots."""
+
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Sum
+from core.models import term_bounds
+from shop.models import PointBalance, PointSnapshot, PointTransaction
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay PointTransaction term by term, compare the running totals with "
+        "PointSnapshot and PointBalance, and exit non-zero on any mismatch."
+    )
+
+    def handle(self, *args, **options):
+        terms = list(
+            PointSnapshot.objects.order_by("term")
+            .values_list("term", flat=True)
+            .distinct()
+        )
+        snapshots = defaultdict(dict)
+        for snapshot in PointSnapshot.objects.all():
+            snapshots[snapshot.term][snapshot.user_id] = snapshot
+
+        mismatches = 0
+        running = defaultdict(int)
+        previous_end = None
+        for term in terms:
+            _, end = term_bounds(term)
+            ledger = PointTransaction.objects.filter(created_at__lt=end)
+            if previous_end:
+                ledger = ledger.filter(created_at__gte=previous_end)
+            replayed = {
+                user_id: (total, count)
+                for user_id, total, count in ledger.values("user")
+                .annotate(total=Sum("amount"), count=Count("id"))
+                .values_list("user", "total", "count")
+            }
+            stored = snapshots[term]
+
+            for user_id in replayed.keys() | stored.keys():
+                total, count = replayed.get(user_id, (0, 0))
+                running[user_id] += total
+                expected = (total, count, running[user_id])
+                row = stored.get(user_id)
+                actual = (
+                    (row.period_total, row.transaction_count, row.balance)
+                    if row
+                    else None
+                )
+                if actual != expected:
+                    mismatches += 1
+                    self.stdout.write(
+                        f"{term:%Y} user {user_id}: snapshot "
+                        f"(total, count, balance) {actual}, ledger {expected}"
+                    )
+            previous_end = end
+
+        tail = PointTransaction.objects.all()
+        if previous_end:
+            tail = tail.filter(created_at__gte=previous_end)
+        for user_id, total in (
+            tail.values("user")
+            .annotate(total=Sum("amount"))
+            .values_list("user", "total")
+        ):
+            running[user_id] += total
+
+        for row in PointBalance.objects.all():
+            expected = running.get(row.user_id, 0)
+            if row.balance != expected:
+                mismatches += 1
+                self.stdout.write(
+                    f"user {row.user_id}: balance {row.balance}, ledger {expected}"
+                )
+
+        if mismatches:
+            self.stderr.write(
+                self.style.ERROR(f"{mismatches} snapshots or balances disagree.")
+            )
+            raise SystemExit(1)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Ledger matches {sum(map(len, snapshots.values()))} snapshots "
+                f"across {len(terms)} terms."
+            )
+        )
@@ -1,11 +1,54 @@
 """Models for shop app."""
 
-from django.db import models
+import hashlib
+import json
+from collections import defaultdict
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, Count, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from core.models import Attendance, Meeting, term_bounds
 
 User = get_user_model()
 
 
+COMPACTED_DELETE_ERROR = (
+    "This transaction is covered by a ledger snapshot; "
+    "record a correcting transaction instead."
+)
+
+
+class PointTransactionQuerySet(models.QuerySet):
+    def compacted(self):
+        """Transactions already folded into a ledger snapshot."""
+        until = PointSnapshot.compacted_until()
+        return self.filter(created_at__lt=until) if until else self.none()
+
+    def delete(self):
+        """Delete uncompacted transactions and reverse them from the balances."""
+        with transaction.atomic():
+            if self.compacted().exists():
+                raise ValidationError(COMPACTED_DELETE_ERROR)
+            totals = dict(
+                self.values("user_id")
+                .annotate(total=Sum("amount"))
+                .order_by()
+                .values_list("user_id", "total")
+            )
+            # Seed while the ledger still holds these rows, then take them
+            # off with one UPDATE per distinct amount.
+            PointBalance.seed(totals)
+            by_amount = defaultdict(list)
+            for user_id, total in totals.items():
+                by_amount[total].append(user_id)
+            for total, user_ids in by_amount.items():
+                PointBalance.apply_bulk(user_ids, -total)
+            return super().delete()
+
+
 class PointTransaction(models.Model):
     """Record of point transactions."""
 
@@ -21,14 +64,436 @@ class PointTransaction(models.Model):
         blank=True,
         related_name="awarded_points",
     )
+    award = models.ForeignKey(
+        "PointAward",
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="transactions",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = PointTransactionQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
 
     def __str__(self):
         return f"{self.user.email} - {self.amount} points"
 
+    def is_compacted(self):
+        """Whether this transaction has been folded into a ledger snapshot."""
+        until = PointSnapshot.compacted_until()
+        return until is not None and self.created_at < until
+
+    def save(self, *args, **kwargs):
+        """Save the transaction and keep the user's balance in step."""
+        if self._state.adding:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                PointBalance.apply(self.user_id, self.amount)
+        else:
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        """Delete an uncompacted transaction and reverse it from the balance.
+
+        Transactions already folded into a snapshot are part of the audited
+        ledger; correct them with a compensating transaction instead.
+        """
+        if self.is_compacted():
+            raise ValidationError(COMPACTED_DELETE_ERROR)
+        with transaction.atomic():
+            PointBalance.apply(self.user_id, -self.amount)
+            return super().delete(*args, **kwargs)
+
+
+class PointBalance(models.Model):
+    """Materialized running total of a user's point transactions.
+
+    ``reserved`` is the sum of points held by open shop orders; only
+    ``balance - reserved`` can be spent on new claims.
+    """
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="point_balance"
+    )
+    balance = models.IntegerField(default=0)
+    reserved = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id} - {self.balance} points"
+
+    @staticmethod
+    def ledger_total(user_id):
+        """Latest snapshot balance plus the transactions recorded after it."""
+        snapshot = PointSnapshot.latest_for(user_id)
+        tail = PointTransaction.objects.filter(user_id=user_id)
+        if snapshot is not None:
+            tail = tail.filter(created_at__gte=snapshot.end)
+        total = tail.aggregate(total=Sum("amount"))["total"] or 0
+        return total + (snapshot.balance if snapshot else 0)
+
+    @classmethod
+    def apply(cls, user_id, delta):
+        """Add delta to a user's balance; call inside the ledger write's transaction.
+
+        A missing row is seeded from the ledger, which already contains the
+        row being written, so balances heal for users that predate the table.
+        """
+        updated = cls.objects.filter(user_id=user_id).update(
+            balance=F("balance") + delta, updated_at=timezone.now()
+        )
+        if updated:
+            return
+        _, created = cls.objects.get_or_create(
+            user_id=user_id, defaults={"balance": cls.ledger_total(user_id)}
+        )
+        if not created:
+            # Another writer seeded the row first without seeing our delta.
+            cls.objects.filter(user_id=user_id).update(
+                balance=F("balance") + delta, updated_at=timezone.now()
+            )
+
+    @classmethod
+    def seed(cls, user_ids):
+        """Create missing balance rows from ledger totals in a fixed number of queries.
+
+        Call before inserting new ledger rows, then ``apply_bulk`` them.
+        """
+        missing = set(user_ids) - set(
+            cls.objects.filter(user_id__in=user_ids).values_list("user_id", flat=True)
+        )
+        if not missing:
+            return
+        # Terms are compacted in order for everyone, so each user's latest
+        # snapshot plus everything since the last compacted term is their
+        # ledger_total.
+        tail = PointTransaction.objects.filter(user_id__in=missing)
+        snapshots = {}
+        compacted_until = PointSnapshot.compacted_until()
+        if compacted_until:
+            tail = tail.filter(created_at__gte=compacted_until)
+            latest = (
+                PointSnapshot.objects.filter(user_id=OuterRef("user_id"))
+                .order_by("-term")
+                .values("term")[:1]
+            )
+            snapshots = dict(
+                PointSnapshot.objects.filter(
+                    user_id__in=missing, term=Subquery(latest)
+                ).values_list("user_id", "balance")
+            )
+        totals = dict(
+            tail.values("user")
+            .annotate(total=Sum("amount"))
+            .order_by()
+            .values_list("user", "total")
+        )
+        cls.objects.bulk_create(
+            [
+                cls(
+                    user_id=user_id,
+                    balance=snapshots.get(user_id, 0) + totals.get(user_id, 0),
+                )
+                for user_id in missing
+            ],
+            batch_size=500,
+            ignore_conflicts=True,
+        )
+
+    @classmethod
+    def apply_bulk(cls, user_ids, delta):
+        """Add the same delta to many seeded balances with one UPDATE."""
+        cls.objects.filter(user_id__in=user_ids).update(
+            balance=F("balance") + delta, updated_at=timezone.now()
+        )
+
+    @classmethod
+    def totals_for(cls, user):
+        """Return (balance, reserved) with a single primary-key lookup."""
+        user_id = getattr(user, "pk", user)
+        totals = (
+            cls.objects.filter(user_id=user_id)
+            .values_list("balance", "reserved")
+            .first()
+        )
+        if totals is None:
+            with transaction.atomic():
+                row, _ = cls.objects.get_or_create(
+                    user_id=user_id, defaults={"balance": cls.ledger_total(user_id)}
+                )
+            return row.balance, row.reserved
+        return totals
+
+    @classmethod
+    def for_user(cls, user):
+        """Return a user's current balance with a single primary-key lookup."""
+        return cls.totals_for(user)[0]
+
+    @classmethod
+    def peek(cls, user_id):
+        """Return a user's balance without creating a missing row (for reads)."""
+        balance = (
+            cls.objects.filter(user_id=user_id)
+            .values_list("balance", flat=True)
+            .first()
+        )
+        return cls.ledger_total(user_id) if balance is None else balance
+
+    @classmethod
+    def reserve(cls, user_id, amount):
+        """Hold ``amount`` points if the user can afford it; return success.
+
+        The check and the hold are one conditional UPDATE, so concurrent
+        claims serialize on this user's row only and can never overspend.
+        """
+
+        def hold():
+            return cls.objects.filter(
+                user_id=user_id, balance__gte=F("reserved") + amount
+            ).update(reserved=F("reserved") + amount, updated_at=timezone.now())
+
+        if hold():
+            return True
+        # Write first, seed after: reading before the UPDATE would let
+        # SQLite's deferred transactions deadlock on the lock upgrade.
+        _, created = cls.objects.get_or_create(
+            user_id=user_id, defaults={"balance": cls.ledger_total(user_id)}
+        )
+        return bool(created and hold())
+
+    @classmethod
+    def release(cls, user_id, amount):
+        """Drop a hold; call inside the transaction that closes the order."""
+        if amount:
+            cls.objects.filter(user_id=user_id).update(
+                reserved=F("reserved") - amount, updated_at=timezone.now()
+            )
+
+
+class PointSnapshot(models.Model):
+    """A user's ledger compacted up to the end of one academic term.
+
+    Only users with transactions in the term get a row. ``balance`` is the
+    running balance at the end of the term, so a user's balance is their
+    latest snapshot plus every transaction after it.
+    """
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="point_snapshots"
+    )
+    term = models.DateField()
+    period_total = models.IntegerField()
+    transaction_count = models.PositiveIntegerField()
+    balance = models.IntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("user", "term")
+        ordering = ["-term"]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.term:%Y}: {self.balance} points"
+
+    @property
+    def end(self):
+        return term_bounds(self.term)[1]
+
+    @classmethod
+    def latest_for(cls, user_id):
+        return cls.objects.filter(user_id=user_id).order_by("-term").first()
+
+    @classmethod
+    def compacted_until(cls):
+        """End of the latest compacted term, or None if nothing is compacted."""
+        term = cls.objects.order_by("-term").values_list("term", flat=True).first()
+        return term_bounds(term)[1] if term else None
+
+    @classmethod
+    def compact(cls, term):
+        """Write snapshots for every user with transactions in ``term``.
+
+        Terms must be compacted in order and only once they have ended.
+        Returns the number of snapshots written.
+        """
+        start, end = term_bounds(term)
+        if end > timezone.now():
+            raise ValueError(f"Term {term:%Y} has not ended yet.")
+
+        with transaction.atomic():
+            compacted_until = cls.compacted_until()
+            if compacted_until and start < compacted_until:
+                raise ValueError(f"Term {term:%Y} is already compacted.")
+            gap = PointTransaction.objects.filter(created_at__lt=start)
+            if compacted_until:
+                gap = gap.filter(created_at__gte=compacted_until)
+            if gap.exists():
+                raise ValueError(f"Compact the terms before {term:%Y} first.")
+
+            previous = (
+                cls.objects.filter(user_id=OuterRef("user_id"), term__lt=term)
+                .order_by("-term")
+                .values("balance")[:1]
+            )
+            rows = (
+                PointTransaction.objects.filter(
+                    created_at__gte=start, created_at__lt=end
+                )
+                .values("user_id")
+                .annotate(
+                    total=Sum("amount"),
+                    count=Count("id"),
+                    previous=Coalesce(Subquery(previous), 0),
+                )
+                .order_by()
+            )
+            snapshots = cls.objects.bulk_create(
+                [
+                    cls(
+                        user_id=row["user_id"],
+                        term=term,
+                        period_total=row["total"],
+                        transaction_count=row["count"],
+                        balance=row["previous"] + row["total"],
+                    )
+                    for row in rows
+                ],
+                batch_size=1000,
+            )
+        return len(snapshots)
+
+
+class PointAward(models.Model):
+    """One bulk award of points to many users.
+
+    A client-supplied ``idempotency_key`` makes retries safe: repeating a
+    request with the same key returns the original award instead of paying
+    out again.
+    """
+
+    idempotency_key = models.CharField(
+        max_length=255, unique=True, null=True, blank=True
+    )
+    fingerprint = models.CharField(max_length=64)
+    amount = models.IntegerField()
+    reason = models.CharField(max_length=255)
+    meeting = models.ForeignKey(
+        Meeting,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="point_awards",
+    )
+    awarded_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, related_name="bulk_awards"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.amount} points - {self.reason}"
+
+    class KeyReused(Exception):
+        """The idempotency key was already used for a different award."""
+
+    @staticmethod
+    def make_fingerprint(amount, reason, meeting_id, user_ids):
+        payload = json.dumps(
+            [amount, reason, meeting_id, sorted(map(str, user_ids or []))]
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @classmethod
+    def grant(cls, amount, reason, awarded_by, user_ids=None, meeting=None, key=None):
+        """Award ``amount`` to every valid user in one transaction.
+
+        Recipients are ``user_ids`` or everyone marked at ``meeting``.
+        Returns ``(award, invalid_ids, created)``; ``created`` is False when
+        ``key`` matched an earlier award, which is returned unchanged.
+        Raises ``PointAward.KeyReused`` if that award had other parameters.
+        """
+        fingerprint = cls.make_fingerprint(
+            amount, reason, meeting.pk if meeting else None, user_ids
+        )
+        if key:
+            existing = cls.objects.filter(idempotency_key=key).first()
+            if existing:
+                return cls._replay(existing, fingerprint)
+
+        if meeting is not None:
+            ids = list(
+                Attendance.objects.filter(meeting=meeting).values_list(
+                    "user_id", flat=True
+                )
+            )
+            invalid = []
+        else:
+            ids, invalid = [], []
+            for raw in user_ids:
+                try:
+                    ids.append(int(raw))
+                except (TypeError, ValueError):
+                    invalid.append(raw)
+            ids = list(dict.fromkeys(ids))
+
+        try:
+            with transaction.atomic():
+                award = cls.objects.create(
+                    idempotency_key=key or None,
+                    fingerprint=fingerprint,
+                    amount=amount,
+                    reason=reason,
+                    meeting=meeting,
+                    awarded_by=awarded_by,
+                )
+                valid = set(
+                    User.objects.filter(id__in=ids, is_active=True).values_list(
+                        "id", flat=True
+                    )
+                )
+                recipients = [user_id for user_id in ids if user_id in valid]
+                PointBalance.seed(recipients)
+                PointTransaction.objects.bulk_create(
+                    [
+                        PointTransaction(
+                            user_id=user_id,
+                            amount=amount,
+                            reason=reason,
+                            awarded_by=awarded_by,
+                            award=award,
+                        )
+                        for user_id in recipients
+                    ],
+                    batch_size=500,
+                )
+                # bulk_create skips PointTransaction.save, so apply balances here.
+                PointBalance.apply_bulk(recipients, amount)
+        except IntegrityError:
+            if not key:
+                raise
+            # A concurrent retry with the same key won the race.
+            return cls._replay(cls.objects.get(idempotency_key=key), fingerprint)
+
+        award.recipient_ids = recipients
+        return (
+            award,
+            invalid + [user_id for user_id in ids if user_id not in valid],
+            True,
+        )
+
+    @classmethod
+    def _replay(cls, award, fingerprint):
+        if award.fingerprint != fingerprint:
+            raise cls.KeyReused(award.idempotency_key)
+        award.recipient_ids = list(
+            award.transactions.order_by("id").values_list("user_id", flat=True)
+        )
+        return award, [], False
+
 
 class ShopItem(models.Model):
     """Item available in the shop."""
@@ -37,8 +502,12 @@ class ShopItem(models.Model):
     description = models.TextField()
     cost = models.IntegerField()  # In points
     image = models.ImageField(upload_to="shop_items/")
+    # Resized WebP copies built by shop.images: {"source": ..., variant: {...}}
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     available = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Part of the catalog version (shop.catalog); bump it on queryset updates.
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -53,12 +522,17 @@ class Order(models.Model):
         REJECTED = "rejected", "Rejected"
         CLAIMED = "claimed", "Claimed"
 
+    OPEN_STATUSES = (Status.PENDING, Status.APPROVED)
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="orders")
     item = models.ForeignKey(ShopItem, on_delete=models.CASCADE)
     quantity = models.IntegerField(default=1)
     status = models.CharField(
         max_length=20, choices=Status.choices, default=Status.PENDING
     )
+    # Points reserved against the user's balance while the order is open
+    points_held = models.IntegerField(default=0)
+
     created_at = models.DateTimeField(auto_now_add=True)
     approved_by = models.ForeignKey(
         User,
@@ -68,5 +542,107 @@ class Order(models.Model):
         related_name="approved_orders",
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="shop_order_queue_idx")
+        ]
+
     def __str__(self):
         return f"{self.user.email} - {self.item.name}"
+
+    @property
+    def cost(self):
+        return self.item.cost * self.quantity
+
+    @classmethod
+    def claim(cls, user, item, quantity):
+        """Reserve the points for an order and create it; None if unaffordable."""
+        cost = item.cost * quantity
+        with transaction.atomic():
+            if not PointBalance.reserve(user.pk, cost):
+                return None
+            return cls.objects.create(
+                user=user, item=item, quantity=quantity, points_held=cost
+            )
+
+    def _close(self, from_statuses, to_status):
+        """Move an open order to ``to_status`` exactly once and drop its hold.
+
+        Returns False if another request already moved it on.
+        """
+        closed = Order.objects.filter(pk=self.pk, status__in=from_statuses).update(
+            status=to_status, points_held=0
+        )
+        if not closed:
+            return False
+        PointBalance.release(self.user_id, self.points_held)
+        self.status, self.points_held = to_status, 0
+        return True
+
+    def mark_claimed(self, by):
+        """Convert the hold into a spend; returns False if not claimable.
+
+        Debits the points held at claim time, so a later price change does
+        not alter what the member pays. Orders placed before holds existed
+        have none and fall back to the current cost.
+        """
+        spend = self.points_held or self.cost
+        with transaction.atomic():
+            if not self._close([self.Status.APPROVED], self.Status.CLAIMED):
+                return False
+            PointTransaction.objects.create(
+                user_id=self.user_id,
+                amount=-spend,
+                reason=f"Claimed {self.quantity}x {self.item.name}",
+                awarded_by=by,
+            )
+        return True
+
+    def reject(self):
+        """Reject an open order and release its hold."""
+        with transaction.atomic():
+            return self._close(self.OPEN_STATUSES, self.Status.REJECTED)
+
+    @classmethod
+    def bulk_approve(cls, order_ids, by):
+        """Approve every pending order in ``order_ids`` with one UPDATE."""
+        return cls.objects.filter(id__in=order_ids, status=cls.Status.PENDING).update(
+            status=cls.Status.APPROVED, approved_by=by
+        )
+
+    @classmethod
+    def bulk_reject(cls, order_ids):
+        """Reject every open order in ``order_ids`` and release their holds.
+
+        Runs a fixed number of statements however many orders are given.
+        The status UPDATE goes first so it takes the row locks before the
+        holds are read back.
+        """
+        with transaction.atomic():
+            rejected = cls.objects.filter(
+                id__in=order_ids, status__in=cls.OPEN_STATUSES
+            ).update(status=cls.Status.REJECTED)
+            holds = dict(
+                cls.objects.filter(
+                    id__in=order_ids, status=cls.Status.REJECTED, points_held__gt=0
+                )
+                .values("user")
+                .annotate(total=Sum("points_held"))
+                .values_list("user", "total")
+            )
+            if holds:
+                PointBalance.objects.filter(user_id__in=holds).update(
+                    reserved=F("reserved")
+                    - Case(
+                        *[
+                            When(user_id=user_id, then=Value(total))
+                            for user_id, total in holds.items()
+                        ],
+                        default=Value(0),
+                    ),
+                    updated_at=timezone.now(),
+                )
+                cls.objects.filter(id__in=order_ids, points_held__gt=0).filter(
+                    status=cls.Status.REJECTED
+                ).update(points_held=0)
+        return rejected
@@ -1,7 +1,8 @@
 """Serializers for shop app."""
 
 from rest_framework import serializers
-from .models import ShopItem, Order, PointTransaction
+from .images import VARIANTS
+from .models import ShopItem, Order, PointTransaction, PointSnapshot
 
 
 class PointTransactionSerializer(serializers.ModelSerializer):
@@ -27,9 +28,20 @@ class PointTransactionSerializer(serializers.ModelSerializer):
         read_only_fields = ("id", "user", "created_at")
 
 
+class PointSnapshotSerializer(serializers.ModelSerializer):
+    """Serializer for a user's compacted ledger term."""
+
+    class Meta:
+        model = PointSnapshot
+        fields = ("term", "period_total", "transaction_count", "balance")
+        read_only_fields = fields
+
+
 class ShopItemSerializer(serializers.ModelSerializer):
     """Serializer for shop items."""
 
+    image_variants = serializers.SerializerMethodField()
+
     class Meta:
         model = ShopItem
         fields = (
@@ -38,11 +50,29 @@ class ShopItemSerializer(serializers.ModelSerializer):
             "description",
             "cost",
             "image",
+            "image_variants",
             "available",
             "created_at",
         )
         read_only_fields = ("id", "created_at")
 
+    def get_image_variants(self, obj):
+        """Resized WebP URLs and sizes; empty until they have been built."""
+        request = self.context.get("request")
+        storage = obj.image.storage
+        variants = {}
+        for variant in VARIANTS:
+            entry = (obj.image_variants or {}).get(variant)
+            if not entry:
+                continue
+            url = storage.url(entry["name"])
+            variants[variant] = {
+                "url": request.build_absolute_uri(url) if request else url,
+                "width": entry["width"],
+                "height": entry["height"],
+            }
+        return variants
+
 
 class OrderSerializer(serializers.ModelSerializer):
     """Serializer for orders/claims."""
@@ -65,6 +95,7 @@ class OrderSerializer(serializers.ModelSerializer):
             "item_cost",
             "quantity",
             "status",
+            "points_held",
             "created_at",
             "approved_by",
             "approved_by_email",
@@ -72,7 +103,24 @@ class OrderSerializer(serializers.ModelSerializer):
         read_only_fields = (
             "id",
             "user",
+            "status",
+            "points_held",
             "created_at",
             "approved_by",
             "approved_by_email",
         )
+
+    def validate_quantity(self, value):
+        if value < 1:
+            raise serializers.ValidationError("Quantity must be at least 1.")
+        return value
+
+    def validate(self, attrs):
+        # The hold was reserved for the original item and quantity.
+        if self.instance is not None:
+            for field in ("item", "quantity"):
+                if field in attrs and attrs[field] != getattr(self.instance, field):
+                    raise serializers.ValidationError(
+                        {field: "Cannot be changed once the order is placed."}
+                    )
+        return attrs
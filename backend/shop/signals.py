@@ -0,0 +1,12 @@
+"""Signal handlers for shop app."""
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from . import images
+from .models import ShopItem
+
+
+@receiver(post_save, sender=ShopItem)
+def shop_item_saved(sender, instance, **kwargs):
+    if images.needs_variants(instance):
+        images.schedule(instance.pk)
@@ -2,7 +2,15 @@
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import views_complete as views
+
+router = DefaultRouter()
+router.register(r"items", views.ShopItemViewSet, basename="shopitem")
+router.register(r"orders", views.OrderViewSet, basename="order")
+router.register(
+    r"point-transactions", views.PointTransactionViewSet, basename="pointtransaction"
+)
 
 urlpatterns = [
-    path("", include("shop.views")),
+    path("", include(router.urls)),
 ]
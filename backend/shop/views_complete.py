@@ -1,15 +1,73 @@
 """Views for shop app - points and merchandise."""
 
-from rest_framework import viewsets, status, permissions, filters
+import base64
+from datetime import date, datetime
+
+from django.db import transaction as db_transaction
+from django.db.models import Q
+from rest_framework import mixins, viewsets, status, permissions, filters
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
-from django.db.models import Sum
-from .models import ShopItem, Order, PointTransaction
-from .serializers import ShopItemSerializer, OrderSerializer, PointTransactionSerializer
+from core.models import Meeting
+from . import catalog
+from .models import (
+    COMPACTED_DELETE_ERROR,
+    ShopItem,
+    Order,
+    PointTransaction,
+    PointBalance,
+    PointSnapshot,
+    PointAward,
+)
+from .serializers import (
+    ShopItemSerializer,
+    OrderSerializer,
+    PointTransactionSerializer,
+    PointSnapshotSerializer,
+)
 
 User = get_user_model()
 
+HISTORY_PAGE_SIZE = 20
+HISTORY_MAX_PAGE_SIZE = 100
+
+
+QUEUE_PAGE_SIZE = 50
+QUEUE_MAX_PAGE_SIZE = 200
+
+
+def encode_order_cursor(order):
+    """Encode an order's (created_at, id) position as an opaque cursor."""
+    raw = f"{order.created_at.isoformat()}|{order.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_order_cursor(cursor):
+    """Decode a cursor back to (created_at, id); raises ValueError if malformed."""
+    created_at, order_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+    return datetime.fromisoformat(created_at), int(order_id)
+
+
+def encode_history_cursor(entry):
+    """Encode the position of a transaction or snapshot as an opaque cursor."""
+    if isinstance(entry, PointSnapshot):
+        raw = f"s|{entry.term.isoformat()}"
+    else:
+        raw = f"t|{entry.created_at.isoformat()}|{entry.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_history_cursor(cursor):
+    """Decode a history cursor; raises ValueError if malformed."""
+    kind, *parts = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+    if kind == "s" and len(parts) == 1:
+        return kind, date.fromisoformat(parts[0])
+    if kind == "t" and len(parts) == 2:
+        return kind, datetime.fromisoformat(parts[0]), int(parts[1])
+    raise ValueError("Unknown cursor")
+
 
 class IsExecOrReadOnly(permissions.BasePermission):
     """Execs can manage, everyone can view."""
@@ -27,12 +85,54 @@ class IsExecOrReadOnly(permissions.BasePermission):
 class ShopItemViewSet(viewsets.ModelViewSet):
     """ViewSet for shop items."""
 
-    queryset = ShopItem.objects.filter(available=True)
+    queryset = ShopItem.objects.filter(available=True).order_by("id")
     serializer_class = ShopItemSerializer
     permission_classes = [permissions.IsAuthenticated, IsExecOrReadOnly]
     filter_backends = [filters.SearchFilter]
     search_fields = ["name", "description"]
 
+    def list(self, request, *args, **kwargs):
+        """List the catalog from the versioned cache.
+
+        Responses carry the catalog version as an ETag, and a matching
+        If-None-Match gets a 304 after a single aggregate query. Searches
+        run over the cached catalog in memory with the same rules as
+        SearchFilter: every term must appear in some search field.
+        """
+        version = catalog.get_version()
+        etag = f'W/"catalog-{version}"'
+        if etag in request.headers.get("If-None-Match", ""):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        items = catalog.get_catalog(
+            version,
+            request,
+            lambda: self.get_serializer(self.get_queryset(), many=True).data,
+        )
+        terms = [
+            term.lower() for term in filters.SearchFilter().get_search_terms(request)
+        ]
+        if terms:
+            items = [
+                item
+                for item in items
+                if all(
+                    any(
+                        term in (item[field] or "").lower()
+                        for field in self.search_fields
+                    )
+                    for term in terms
+                )
+            ]
+
+        page = self.paginate_queryset(items)
+        if page is not None:
+            response = self.get_paginated_response(page)
+        else:
+            response = Response(items)
+        response["ETag"] = etag
+        return response
+
 
 class OrderViewSet(viewsets.ModelViewSet):
     """ViewSet for orders/claims."""
@@ -43,18 +143,40 @@ class OrderViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Users see only their orders; execs see all."""
+        orders = Order.objects.select_related("user", "item", "approved_by")
         if self.request.user.role in ["exec", "admin"]:
-            return Order.objects.all()
-        return Order.objects.filter(user=self.request.user)
+            return orders.order_by("-created_at", "-id")
+        return orders.filter(user=self.request.user).order_by("-created_at", "-id")
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        """Create an order, holding its cost against the user's balance."""
+        cost = serializer.validated_data["item"].cost * serializer.validated_data.get(
+            "quantity", 1
+        )
+        with db_transaction.atomic():
+            if not PointBalance.reserve(self.request.user.pk, cost):
+                raise ValidationError({"error": "Insufficient points"})
+            serializer.save(user=self.request.user, points_held=cost)
+
+    def perform_destroy(self, instance):
+        """Delete an order, releasing its hold first if it is still open."""
+        with db_transaction.atomic():
+            instance.reject()
+            instance.delete()
 
     @action(detail=False, methods=["post"])
     def claim_item(self, request):
-        """Claim an item from the shop."""
+        """Claim an item from the shop, holding its cost until it is handed over."""
         item_id = request.data.get("item_id")
-        quantity = int(request.data.get("quantity", 1))
+        try:
+            quantity = int(request.data.get("quantity", 1))
+        except (TypeError, ValueError):
+            quantity = 0
+        if quantity < 1:
+            return Response(
+                {"error": "quantity must be a positive integer"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
         try:
             item = ShopItem.objects.get(id=item_id, available=True)
@@ -63,28 +185,124 @@ class OrderViewSet(viewsets.ModelViewSet):
                 {"error": "Item not found"}, status=status.HTTP_404_NOT_FOUND
             )
 
-        user = request.user
-        total_points = (
-            user.point_transactions.aggregate(total=Sum("amount"))["total"] or 0
-        )
-        cost = item.cost * quantity
-
-        if total_points < cost:
+        order = Order.claim(request.user, item, quantity)
+        if order is None:
+            balance, reserved = PointBalance.totals_for(request.user)
+            cost = item.cost * quantity
             return Response(
                 {
-                    "error": f"Insufficient points. You have {total_points}, need {cost}",
-                    "points_available": total_points,
+                    "error": f"Insufficient points. You have {balance - reserved} "
+                    f"available, need {cost}",
+                    "points_available": balance - reserved,
                     "cost": cost,
                 },
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        order = Order.objects.create(
-            user=user, item=item, quantity=quantity, status=Order.Status.PENDING
-        )
         serializer = self.get_serializer(order)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=["get"])
+    def queue(self, request):
+        """Exec review queue, oldest first (exec only).
+
+        Filter with ``status`` (comma-separated, default ``pending``) and
+        pass the returned ``next_cursor`` as ``after`` for the next page.
+        Seeks on (created_at, id) over the (status, created_at) index.
+        """
+        if request.user.role not in ["exec", "admin"]:
+            return Response(
+                {"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN
+            )
+
+        statuses = request.query_params.get("status", Order.Status.PENDING).split(",")
+        if not set(statuses) <= set(Order.Status.values):
+            return Response(
+                {"error": f"status must be one of {', '.join(Order.Status.values)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            limit = min(
+                int(request.query_params.get("limit", QUEUE_PAGE_SIZE)),
+                QUEUE_MAX_PAGE_SIZE,
+            )
+        except ValueError:
+            limit = QUEUE_PAGE_SIZE
+        limit = max(limit, 1)
+
+        orders = (
+            Order.objects.filter(status__in=statuses)
+            .select_related("user", "item", "approved_by")
+            .order_by("created_at", "id")
+        )
+
+        after = request.query_params.get("after")
+        if after:
+            try:
+                created_at, order_id = decode_order_cursor(after)
+            except ValueError:
+                return Response(
+                    {"error": "Invalid cursor"}, status=status.HTTP_400_BAD_REQUEST
+                )
+            orders = orders.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=order_id)
+            )
+
+        page = list(orders[: limit + 1])
+        has_more = len(page) > limit
+        page = page[:limit]
+
+        return Response(
+            {
+                "results": self.get_serializer(page, many=True).data,
+                "next_cursor": encode_order_cursor(page[-1]) if has_more else None,
+            }
+        )
+
+    def _bulk_order_ids(self, request):
+        order_ids = request.data.get("order_ids")
+        if not order_ids or not isinstance(order_ids, list):
+            return None
+        try:
+            return list(dict.fromkeys(int(order_id) for order_id in order_ids))
+        except (TypeError, ValueError):
+            return None
+
+    @action(detail=False, methods=["post"])
+    def bulk_approve(self, request):
+        """Approve many pending orders in one statement (exec only)."""
+        if request.user.role not in ["exec", "admin"]:
+            return Response(
+                {"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN
+            )
+
+        order_ids = self._bulk_order_ids(request)
+        if order_ids is None:
+            return Response(
+                {"error": "order_ids required"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        approved = Order.bulk_approve(order_ids, request.user)
+        return Response({"approved": approved, "skipped": len(order_ids) - approved})
+
+    @action(detail=False, methods=["post"])
+    def bulk_reject(self, request):
+        """Reject many open orders and release their points (exec only)."""
+        if request.user.role not in ["exec", "admin"]:
+            return Response(
+                {"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN
+            )
+
+        order_ids = self._bulk_order_ids(request)
+        if order_ids is None:
+            return Response(
+                {"error": "order_ids required"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        rejected = Order.bulk_reject(order_ids)
+        return Response({"rejected": rejected, "skipped": len(order_ids) - rejected})
+
     @action(detail=True, methods=["post"])
     def approve(self, request, pk=None):
         """Approve an order (exec only)."""
@@ -94,45 +312,58 @@ class OrderViewSet(viewsets.ModelViewSet):
             )
 
         order = self.get_object()
-        order.status = Order.Status.APPROVED
-        order.approved_by = request.user
-        order.save()
+        approved = Order.objects.filter(
+            pk=order.pk, status=Order.Status.PENDING
+        ).update(status=Order.Status.APPROVED, approved_by=request.user)
+        if not approved:
+            return Response(
+                {"error": "Only pending orders can be approved"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        order.refresh_from_db()
         serializer = self.get_serializer(order)
         return Response(serializer.data)
 
     @action(detail=True, methods=["post"])
-    def mark_claimed(self, request, pk=None):
-        """Mark order as claimed (exec only)."""
+    def reject(self, request, pk=None):
+        """Reject an open order and release its points (exec only)."""
         if request.user.role not in ["exec", "admin"]:
             return Response(
                 {"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN
             )
 
         order = self.get_object()
-        if order.status != Order.Status.APPROVED:
+        if not order.reject():
             return Response(
-                {"error": "Order must be approved first"},
+                {"error": "Order is already closed"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        order.status = Order.Status.CLAIMED
-        order.save()
+        serializer = self.get_serializer(order)
+        return Response(serializer.data)
 
-        # Deduct points from user
-        total_cost = order.item.cost * order.quantity
-        PointTransaction.objects.create(
-            user=order.user,
-            amount=-total_cost,
-            reason=f"Claimed {order.quantity}x {order.item.name}",
-            awarded_by=request.user,
-        )
+    @action(detail=True, methods=["post"])
+    def mark_claimed(self, request, pk=None):
+        """Mark order as claimed and spend its held points (exec only)."""
+        if request.user.role not in ["exec", "admin"]:
+            return Response(
+                {"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN
+            )
+
+        order = self.get_object()
+        if not order.mark_claimed(by=request.user):
+            return Response(
+                {"error": "Order must be approved first"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
         serializer = self.get_serializer(order)
         return Response(serializer.data)
 
 
-class PointTransactionViewSet(viewsets.ReadOnlyModelViewSet):
-    """ViewSet for viewing point transactions."""
+class PointTransactionViewSet(mixins.DestroyModelMixin, viewsets.ReadOnlyModelViewSet):
+    """ViewSet for viewing point transactions; execs may delete uncompacted ones."""
 
     queryset = PointTransaction.objects.all()
     serializer_class = PointTransactionSerializer
@@ -145,6 +376,14 @@ class PointTransactionViewSet(viewsets.ReadOnlyModelViewSet):
             return PointTransaction.objects.all()
         return PointTransaction.objects.filter(user=self.request.user)
 
+    def perform_destroy(self, instance):
+        """Delete an uncompacted transaction (exec only), reversing the balance."""
+        if self.request.user.role not in ["exec", "admin"]:
+            raise PermissionDenied("Permission denied")
+        if instance.is_compacted():
+            raise ValidationError({"error": COMPACTED_DELETE_ERROR})
+        instance.delete()
+
     @action(detail=False, methods=["post"])
     def award_points(self, request):
         """Award points to a user (exec only)."""
@@ -176,10 +415,167 @@ class PointTransactionViewSet(viewsets.ReadOnlyModelViewSet):
         serializer = self.get_serializer(transaction)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=["post"])
+    def bulk_award(self, request):
+        """Award points to a list of users or a whole meeting (exec only).
+
+        Send an ``Idempotency-Key`` header (or ``idempotency_key``) so a
+        retried request returns the original award instead of paying twice.
+        """
+        if request.user.role not in ["exec", "admin"]:
+            return Response(
+                {"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN
+            )
+
+        user_ids = request.data.get("user_ids")
+        meeting_id = request.data.get("meeting_id")
+        reason = request.data.get("reason", "Points awarded")
+        key = request.headers.get("Idempotency-Key") or request.data.get(
+            "idempotency_key"
+        )
+        try:
+            amount = int(request.data.get("amount"))
+        except (TypeError, ValueError):
+            amount = 0
+
+        if not amount or bool(user_ids) == bool(meeting_id):
+            return Response(
+                {"error": "amount and exactly one of user_ids or meeting_id required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if user_ids is not None and not isinstance(user_ids, list):
+            return Response(
+                {"error": "user_ids must be a list"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        meeting = None
+        if meeting_id:
+            try:
+                meeting = Meeting.objects.get(id=meeting_id)
+            except (Meeting.DoesNotExist, ValueError):
+                return Response(
+                    {"error": "Meeting not found"}, status=status.HTTP_404_NOT_FOUND
+                )
+
+        try:
+            award, invalid, created = PointAward.grant(
+                amount,
+                reason,
+                request.user,
+                user_ids=user_ids,
+                meeting=meeting,
+                key=key,
+            )
+        except PointAward.KeyReused:
+            return Response(
+                {"error": "Idempotency key already used for a different award"},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        return Response(
+            {
+                "award_id": award.id,
+                "amount": award.amount,
+                "reason": award.reason,
+                "awarded": len(award.recipient_ids),
+                "user_ids": award.recipient_ids,
+                "invalid_ids": invalid,
+                "replayed": not created,
+            },
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=["get"])
+    def history(self, request):
+        """Page backwards through a user's ledger.
+
+        Transactions since the latest snapshot come first, newest first,
+        followed by one entry per compacted term. Pass ``next_cursor`` as
+        ``before`` for the next page. Execs may pass ``user_id``.
+        """
+        user_id = request.user.id
+        if request.user.role in ["exec", "admin"]:
+            try:
+                user_id = int(request.query_params.get("user_id", user_id))
+            except ValueError:
+                return Response(
+                    {"error": "Invalid user_id"}, status=status.HTTP_400_BAD_REQUEST
+                )
+            if (
+                user_id != request.user.id
+                and not User.objects.filter(pk=user_id).exists()
+            ):
+                return Response(
+                    {"error": "User not found"}, status=status.HTTP_404_NOT_FOUND
+                )
+
+        try:
+            limit = min(
+                int(request.query_params.get("limit", HISTORY_PAGE_SIZE)),
+                HISTORY_MAX_PAGE_SIZE,
+            )
+        except ValueError:
+            limit = HISTORY_PAGE_SIZE
+        limit = max(limit, 1)
+
+        cursor = None
+        before = request.query_params.get("before")
+        if before:
+            try:
+                cursor = decode_history_cursor(before)
+            except ValueError:
+                return Response(
+                    {"error": "Invalid cursor"}, status=status.HTTP_400_BAD_REQUEST
+                )
+
+        entries = []
+        if cursor is None or cursor[0] == "t":
+            transactions = (
+                PointTransaction.objects.filter(user_id=user_id)
+                .select_related("user", "awarded_by")
+                .order_by("-created_at", "-id")
+            )
+            snapshot = PointSnapshot.latest_for(user_id)
+            if snapshot is not None:
+                transactions = transactions.filter(created_at__gte=snapshot.end)
+            if cursor:
+                _, created_at, transaction_id = cursor
+                transactions = transactions.filter(
+                    Q(created_at__lt=created_at)
+                    | Q(created_at=created_at, id__lt=transaction_id)
+                )
+            entries = list(transactions[: limit + 1])
+
+        if len(entries) <= limit:
+            snapshots = PointSnapshot.objects.filter(user_id=user_id).order_by("-term")
+            if cursor and cursor[0] == "s":
+                snapshots = snapshots.filter(term__lt=cursor[1])
+            entries += list(snapshots[: limit + 1 - len(entries)])
+
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+
+        results = [
+            (
+                {"type": "snapshot", **PointSnapshotSerializer(entry).data}
+                if isinstance(entry, PointSnapshot)
+                else {"type": "transaction", **PointTransactionSerializer(entry).data}
+            )
+            for entry in entries
+        ]
+        return Response(
+            {
+                "balance": PointBalance.peek(user_id),
+                "results": results,
+                "next_cursor": encode_history_cursor(entries[-1]) if has_more else None,
+            }
+        )
+
     @action(detail=False, methods=["get"])
     def my_balance(self, request):
         """Get current user's point balance."""
-        total = (
-            request.user.point_transactions.aggregate(total=Sum("amount"))["total"] or 0
+        balance, reserved = PointBalance.totals_for(request.user)
+        return Response(
+            {"points": balance, "reserved": reserved, "available": balance - reserved}
         )
-        return Response({"points": total})